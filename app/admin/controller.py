@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiler import ProfilerBusy, get_profile, profile_window
+from app.core.slow_queries import get_slow_queries
+from app.db.database import engine
+from app.document_type.service import notify_document_types_changed
+from app.deps.user import get_admin_user
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(get_admin_user)]
+)
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """Reports the live checkout, overflow and wait statistics of the connection pool."""
+    return engine.pool.stats()
+
+
+@router.post("/document-types/reload")
+async def reload_document_types():
+    """Makes every worker reload its document type registry, e.g. after editing the table."""
+    await notify_document_types_changed()
+    return {"msg": "Document type reload requested"}
+
+
+@router.get("/slow-queries")
+async def slow_queries():
+    """Lists the slow queries captured by this worker, newest first, with any EXPLAIN plan taken."""
+    return get_slow_queries()
+
+
+@router.post("/profiles", status_code=status.HTTP_202_ACCEPTED)
+async def start_profile(seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS)):
+    """Samples this worker for a number of seconds; fetch the result by its ``profile_id``."""
+    try:
+        profile_id = await profile_window(seconds)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return {"profile_id": profile_id}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def read_profile(profile_id: str):
+    """Returns a finished profile as collapsed stacks, ready for flame graph tools."""
+    profile = await get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or not finished")
+    return profile
@@ -0,0 +1,62 @@
+from typing import Any, Iterator, List, Sequence, Set, Tuple, Type, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+BULK_INSERT_CHUNK_SIZE = 1000
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkCreateResult(BaseModel):
+    created: int
+    ids: List[UUID]
+    errors: List[BulkRowError]
+
+
+def validate_rows(
+    rows: Sequence[dict], schema: Type[SchemaT]
+) -> Tuple[List[Tuple[int, SchemaT]], List[BulkRowError]]:
+    """
+    Validates every row of a batch against a schema.
+
+    Args:
+        rows (Sequence[dict]): The raw rows of the batch.
+        schema (Type[BaseModel]): The schema each row must satisfy.
+
+    Returns:
+        tuple: The valid rows paired with their index in the batch, and one
+            error per invalid row.
+    """
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+            errors.append(BulkRowError(index=index, detail=detail))
+    return valid, errors
+
+
+def chunked(items: Sequence, size: int = BULK_INSERT_CHUNK_SIZE) -> Iterator[Sequence]:
+    """Splits a sequence into chunks that fit in a single multi-row INSERT."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+async def existing_values(db: AsyncSession, column, values: Set[Any]) -> Set[Any]:
+    """Returns which of the given values are already stored in a column, in one query."""
+    if not values:
+        return set()
+    result = await db.execute(select(column).where(column.in_(values)))
+    return set(result.scalars().all())
@@ -0,0 +1,520 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import Response
+
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.metrics import CallbackCounter, CallbackGauge, record_cache_lookup
+from app.db.database import reading_from_primary
+from app.deps.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 3600
+LOCK_POLL_INTERVAL_SECONDS = 0.05
+
+# Creates a missing namespace counter at the given epoch before bumping it.
+_BUMP_VERSION_SCRIPT = """
+redis.call("set", KEYS[1], ARGV[1], "NX")
+return redis.call("incr", KEYS[1])
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LocalCache:
+    """
+    Bounded, per-worker LRU cache with a TTL on every entry.
+
+    It sits in front of Redis so hot keys are served without any network I/O.
+    Entries are evicted in least-recently-used order once ``max_size`` is
+    reached, and expire after ``ttl_seconds`` even if an invalidation message
+    is lost, which bounds how stale a worker can get.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        """Stores a value, evicting the least recently used entries if full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        """Removes the given keys if present."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry and resets the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the size and hit/miss counters of the cache."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+local_cache = LocalCache(
+    max_size=settings.LOCAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.LOCAL_CACHE_TTL_SECONDS,
+)
+
+CallbackCounter(
+    "cache_local_hits_total",
+    "Lookups served by the in-process cache tier.",
+    [],
+    lambda: {(): local_cache.hits},
+)
+CallbackCounter(
+    "cache_local_misses_total",
+    "Lookups the in-process cache tier could not serve.",
+    [],
+    lambda: {(): local_cache.misses},
+)
+CallbackGauge(
+    "cache_local_entries",
+    "Entries held by the in-process cache tier.",
+    [],
+    lambda: {(): local_cache.stats()["size"]},
+)
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Reads a key from the local tier, falling back to Redis."""
+    value = local_cache.get(key)
+    record_cache_lookup(key, "local", value is not None)
+    if value is not None:
+        return value
+    value = await redis_client.get(key)
+    record_cache_lookup(key, "redis", value is not None)
+    if value is not None:
+        local_cache.set(key, value)
+    return value
+
+
+async def cache_set(key: str, value: str, ttl: int = CACHE_TTL_SECONDS) -> None:
+    """Writes a key to Redis and to the local tier."""
+    await redis_client.setex(key, ttl, value)
+    local_cache.set(key, value)
+
+
+async def cache_get_many(keys: Sequence[str]) -> List[Optional[str]]:
+    """Reads several keys, from the local tier first and the rest with one MGET."""
+    values = [local_cache.get(key) for key in keys]
+    for key, value in zip(keys, values):
+        record_cache_lookup(key, "local", value is not None)
+    missing = [index for index, value in enumerate(values) if value is None]
+    if missing:
+        fetched = await redis_client.mget([keys[index] for index in missing])
+        for index, value in zip(missing, fetched):
+            record_cache_lookup(keys[index], "redis", value is not None)
+            if value is not None:
+                local_cache.set(keys[index], value)
+                values[index] = value
+    return values
+
+
+async def cache_set_many(items: Dict[str, str], ttl: int = CACHE_TTL_SECONDS) -> None:
+    """Writes several keys to Redis in one pipelined round trip, and to the local tier."""
+    if not items:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value in items.items():
+            pipe.setex(key, ttl, value)
+        await pipe.execute()
+    for key, value in items.items():
+        local_cache.set(key, value)
+
+
+async def _publish_invalidation(*keys: str) -> None:
+    local_cache.delete(*keys)
+    await redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, "\n".join(keys))
+
+
+async def cache_delete(*keys: str) -> None:
+    """Deletes keys from Redis and from the local tier of every worker."""
+    await redis_client.delete(*keys)
+    await _publish_invalidation(*keys)
+
+
+_in_flight: "dict[str, asyncio.Future]" = {}
+
+
+async def single_flight(key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Runs ``loader`` at most once at a time per key within this worker.
+
+    Concurrent callers for the same key wait on the in-flight loader and share
+    its result instead of issuing the same query themselves.
+    """
+    future = _in_flight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The loading request went away; take over the load ourselves.
+            return await single_flight(key, loader)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        result = await loader()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark the exception as retrieved in case nobody was waiting.
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _in_flight[key]
+
+
+def _written_key(namespace: str) -> str:
+    return f"{namespace}:written"
+
+
+async def _load_fresh(namespace: Optional[str], loader: Callable[..., Awaitable[Any]], *args) -> Any:
+    """
+    Runs a cache loader, on the primary if the namespace was written recently.
+
+    Within ``REPLICA_STICKINESS_SECONDS`` of a write the replica may still
+    lag behind it, and whatever the loader reads is cached for every client,
+    so it must not come from the replica.
+    """
+    if (
+        namespace is not None
+        and settings.REPLICA_DATABASE_URL
+        and await redis_client.exists(_written_key(namespace))
+    ):
+        with reading_from_primary():
+            return await loader(*args)
+    return await loader(*args)
+
+
+async def _load_with_lock(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    decode: Callable[[str], Any],
+) -> Any:
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    timeout_ms = settings.CACHE_LOCK_TIMEOUT_MS
+    if await redis_client.set(lock_key, token, nx=True, px=timeout_ms):
+        try:
+            return await loader()
+        finally:
+            await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    # Another worker is loading the key: wait for it to release the lock and
+    # read what it cached, loading ourselves only if it left nothing behind.
+    deadline = time.monotonic() + timeout_ms / 1000
+    while time.monotonic() < deadline and await redis_client.exists(lock_key):
+        await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+    cached = await cache_get(key)
+    if cached is not None:
+        return decode(cached)
+    return await loader()
+
+
+async def cache_aside(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    decode: Callable[[str], Any],
+    namespace: Optional[str] = None,
+) -> Any:
+    """
+    Reads a key through the cache, coalescing concurrent misses.
+
+    On a miss only one request per worker runs ``loader``, and a short Redis
+    lock keeps the other workers waiting for its result instead of all
+    querying the database at once.
+
+    Args:
+        key (str): The cache key.
+        loader (Callable): Loads the value from the database and caches it.
+        decode (Callable): Builds the return value from a cached string.
+        namespace (str, optional): The namespace whose writes change the
+            value. Recent writes to it make ``loader`` read from the primary.
+
+    Returns:
+        Any: The decoded cached value, or whatever ``loader`` returned.
+    """
+    cached = await cache_get(key)
+    if cached is not None:
+        return decode(cached)
+    return await single_flight(
+        key, lambda: _load_with_lock(key, lambda: _load_fresh(namespace, loader), decode)
+    )
+
+
+async def cache_aside_many(
+    ids: Sequence[Any],
+    key: Callable[[Any], str],
+    loader: Callable[[List[Any]], Awaitable[Dict[Any, Any]]],
+    decode: Callable[[str], Any],
+    encode: Callable[[Any], str],
+    namespace: Optional[str] = None,
+) -> List[Any]:
+    """
+    Reads a batch of entities through the cache in a fixed number of round trips.
+
+    Cached entries come from one MGET, the misses from a single ``loader``
+    call, and whatever it found is written back with one pipelined SETEX.
+
+    Args:
+        ids (Sequence): The IDs to look up.
+        key (Callable): Builds the cache key of an ID.
+        loader (Callable): Loads the missing IDs, returning values by ID.
+        decode (Callable): Builds a value from a cached string.
+        encode (Callable): Serializes a loaded value for the cache.
+        namespace (str, optional): The namespace whose writes change the
+            values. Recent writes to it make ``loader`` read from the primary.
+
+    Returns:
+        list: The values found, in the order of ``ids``, skipping unknown IDs.
+    """
+    ids = list(dict.fromkeys(ids))
+    cached = await cache_get_many([key(entity_id) for entity_id in ids])
+    found = {
+        entity_id: decode(value)
+        for entity_id, value in zip(ids, cached)
+        if value is not None
+    }
+    missing = [entity_id for entity_id in ids if entity_id not in found]
+    if missing:
+        loaded = await _load_fresh(namespace, loader, missing)
+        await cache_set_many(
+            {key(entity_id): encode(value) for entity_id, value in loaded.items()}
+        )
+        found.update(loaded)
+    return [found[entity_id] for entity_id in ids if entity_id in found]
+
+
+async def cached_response(
+    key: str,
+    render: Callable[[], Awaitable[tuple[str, dict]]],
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Serves a JSON response body straight from the cache.
+
+    The cached value is the final body, prefixed with a line holding the
+    response headers, so a hit costs a single cache read and no model
+    construction or validation at all. The response carries an ETag derived
+    from the key, and a client that already holds it gets a 304 without the
+    cached value even being read.
+
+    Args:
+        key (str): The versioned cache key, as built by ``list_cache_key``.
+        render (Callable): Queries the database and returns the JSON body
+            together with any response headers.
+        if_none_match (str, optional): The request's ``If-None-Match`` header.
+
+    Returns:
+        Response: A JSON response wrapping the cached or rendered body, or a
+            304 response.
+    """
+    etag = make_etag(key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    async def load():
+        body, headers = await render()
+        cached = f"{json.dumps(headers)}\n{body}"
+        await cache_set(key, cached)
+        return cached
+
+    namespace = key.split(":", 1)[0]
+    cached = await cache_aside(key, load, lambda cached: cached, namespace)
+    headers, body = cached.split("\n", 1)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**json.loads(headers), "ETag": etag},
+    )
+
+
+def _version_key(namespace: str) -> str:
+    return f"{namespace}:version"
+
+
+def _version_epoch() -> int:
+    # Counters are created at the current time in microseconds rather than at
+    # zero, so one recreated after Redis lost its data starts beyond every
+    # value the lost one reached and never reissues a generation, or an ETag,
+    # that clients may still hold for other data.
+    return time.time_ns() // 1000
+
+
+async def get_namespace_version(namespace: str) -> int:
+    """Returns the current generation counter of a cache namespace, creating it if missing."""
+    key = _version_key(namespace)
+    version = await cache_get(key)
+    if version is None:
+        epoch = str(_version_epoch())
+        if await redis_client.set(key, epoch, nx=True):
+            local_cache.set(key, epoch)
+            version = epoch
+        else:
+            version = await cache_get(key)
+    return int(version)
+
+
+async def list_cache_key(namespace: str, **params) -> str:
+    """
+    Builds a list cache key tagged with the namespace generation.
+
+    Args:
+        namespace (str): The entity namespace, e.g. "students".
+        **params: Query parameters that identify the cached page.
+
+    Returns:
+        str: A key such as "students:v1760000000000003:skip=0:limit=10".
+    """
+    version = await get_namespace_version(namespace)
+    parts = ":".join(f"{name}={value}" for name, value in params.items())
+    return f"{namespace}:v{version}:{parts}"
+
+
+async def detail_etag(namespace: str, entity_id: Any) -> str:
+    """
+    Returns the ETag of a single entity of a namespace.
+
+    It follows the namespace generation, which every write that can change or
+    remove an entity of the namespace bumps, so it is known without reading
+    the entity itself.
+    """
+    return make_etag(await list_cache_key(namespace, id=entity_id))
+
+
+async def entity_key(prefix: str) -> Callable[[Any], str]:
+    """
+    Returns the builder of the cache keys of single entities, e.g. "student".
+
+    The keys carry a generation of their own, which ``invalidate_entities``
+    bumps to drop every cached entity of a kind without knowing their IDs.
+    """
+    generation = await get_namespace_version(f"{prefix}:entities")
+    return lambda entity_id: f"{prefix}:g{generation}:{entity_id}"
+
+
+async def entity_cache_key(prefix: str, entity_id: Any) -> str:
+    """Returns the cache key of a single entity, e.g. of the student with an ID."""
+    return (await entity_key(prefix))(entity_id)
+
+
+async def invalidate_entities(prefix: str) -> None:
+    """Drops every cached entity of a kind, e.g. after a cascading delete."""
+    await invalidate_namespace(f"{prefix}:entities")
+
+
+async def invalidate_namespace(namespace: str) -> None:
+    """
+    Invalidates every list page cached under a namespace.
+
+    Bumping the generation counter makes all previously built keys unreachable,
+    so the stale pages are never read again and simply expire with their TTL.
+    With a replica configured, the namespace is also marked as written so the
+    next fills read from the primary until the replica has caught up.
+    """
+    if settings.REPLICA_DATABASE_URL:
+        await redis_client.set(
+            _written_key(namespace), 1, ex=settings.REPLICA_STICKINESS_SECONDS
+        )
+    await redis_client.eval(
+        _BUMP_VERSION_SCRIPT, 1, _version_key(namespace), _version_epoch()
+    )
+    await _publish_invalidation(_version_key(namespace))
+
+
+async def listen(
+    channel: str,
+    on_message: Callable[[str], Awaitable[None]],
+    on_subscribe: Optional[Callable[[], Awaitable[None]]] = None,
+) -> None:
+    """
+    Runs a handler for every message published on a Redis channel.
+
+    Reconnects with a short delay if the connection drops. ``on_subscribe``
+    runs after every (re)subscription, to catch up on anything missed while
+    disconnected.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribe is not None:
+                await on_subscribe()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    await on_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Listener for %s failed, reconnecting", channel)
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+async def _evict_local(message: str) -> None:
+    local_cache.delete(*message.split("\n"))
+
+
+async def _clear_local() -> None:
+    # Anything cached while we were not listening may be stale.
+    local_cache.clear()
+
+
+async def listen_for_invalidations() -> None:
+    """
+    Keeps the local tier coherent with the other workers.
+
+    Evicts every key announced on the invalidation channel.
+    """
+    await listen(settings.CACHE_INVALIDATION_CHANNEL, _evict_local, on_subscribe=_clear_local)
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,9 +7,39 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    USER_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    ADMIN_USERNAMES: List[str] = []
     DATABASE_URL: str
+    REPLICA_DATABASE_URL: Optional[str] = None
+    REPLICA_STICKINESS_SECONDS: int = 5
+    DB_ECHO: bool = False
+    SERVER_TIMING_LOG: bool = False
+    QUERY_COUNT_WARNING_THRESHOLD: int = 20
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_LOG_SIZE: int = 100
+    PROFILER_INTERVAL_MS: float = 5
+    PROFILER_MAX_SECONDS: int = 60
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    LOCAL_CACHE_MAX_SIZE: int = 10000
+    LOCAL_CACHE_TTL_SECONDS: float = 30
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_LOCK_TIMEOUT_MS: int = 3000
+    BULK_CREATE_MAX_ROWS: int = 5000
+    BATCH_MAX_IDS: int = 100
+    EXPORT_FETCH_SIZE: int = 1000
+    SCHOOL_PURGE_CHUNK_SIZE: int = 5000
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
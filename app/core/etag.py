@@ -0,0 +1,34 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+
+def make_etag(key: str) -> str:
+    """
+    Builds a strong ETag from a versioned cache key.
+
+    The keys embed the generation counter of their namespace, so the tag
+    changes whenever anything the response depends on is written.
+    """
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, wildcard: bool = True) -> bool:
+    """
+    Checks an ``If-None-Match`` header against an ETag.
+
+    ``*`` matches any current representation, so pass ``wildcard=False`` until
+    the resource is known to exist.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return wildcard
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Builds an empty ``304 Not Modified`` response."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
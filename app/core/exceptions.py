@@ -2,6 +2,8 @@ from fastapi import Request, status, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
 
+from app.core.security import PasswordHasherBusy
+
 
 def register_exception_handlers(app):
     """
@@ -73,3 +75,12 @@ def register_exception_handlers(app):
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Handles FastAPI HTTPException, returning a JSON response."""
         return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+    @app.exception_handler(PasswordHasherBusy)
+    async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+        """Handles a full password hashing queue, asking the client to retry shortly."""
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Too many concurrent authentication requests"},
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _to_text(value):
+    return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+
+async def stream_rows(
+    session_factory: Callable[[], AsyncSession],
+    query: Select,
+    export_format: ExportFormat,
+) -> AsyncIterator[str]:
+    """
+    Streams the rows of a query as NDJSON or CSV text.
+
+    The query runs on a server-side cursor that fetches ``EXPORT_FETCH_SIZE``
+    rows at a time, and each batch is written out before the next one is
+    fetched, so memory stays flat regardless of how many rows are exported.
+
+    The session is opened here rather than taken from ``get_db`` because the
+    request's dependencies are closed before a streaming body is sent.
+    """
+    async with session_factory() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+        )
+        fields = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(fields)
+        async for rows in result.partitions():
+            if export_format == "csv":
+                writer.writerows([_to_text(value) for value in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(fields, map(_to_text, row)))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if export_format == "csv" and buffer.tell():
+            yield buffer.getvalue()
+
+
+def export_response(
+    session_factory: Callable[[], AsyncSession],
+    query: Select,
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Builds a streaming download of a query in the requested format."""
+    return StreamingResponse(
+        stream_rows(session_factory, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"'
+        },
+    )
@@ -0,0 +1,257 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from app.db.database import engine, replica_engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric(ABC):
+    """
+    Base class of the metrics exposed at ``/metrics``.
+
+    Samples live in plain dicts keyed by label values. Every update happens
+    on the event loop thread, so the hot path takes no lock.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, LabelValues, Sequence[str], float]]:
+        """Returns ``(suffix, label values, extra label names, value)`` for every sample."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, values, extra_names, value in self.samples():
+            names = self.labelnames + tuple(extra_names)
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        return [("", values, (), value) for values, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def samples(self):
+        return [("", values, (), value) for values, value in self._values.items()]
+
+
+class CallbackGauge(Metric):
+    """A gauge read from its source when scraped, e.g. connection pool occupancy."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        return [("", values, (), value) for values, value in self.callback().items()]
+
+
+class CallbackCounter(CallbackGauge):
+    """A counter kept by its source and read when scraped, e.g. cache hits."""
+
+    type = "counter"
+
+
+class Histogram(Metric):
+    """Counts observations into cumulative buckets, e.g. request latencies."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, *labelvalues: str, value: float) -> None:
+        counts = self._values.get(labelvalues)
+        if counts is None:
+            counts = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        samples = []
+        for values, counts in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples.append(("_bucket", values + (le,), ("le",), cumulative))
+            samples.append(("_sum", values, (), counts[-1]))
+            samples.append(("_count", values, (), cumulative))
+        return samples
+
+
+registry: List[Metric] = []
+
+
+def render() -> str:
+    """Renders every metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in registry) + "\n"
+
+
+def _pool_connections() -> Dict[LabelValues, float]:
+    values = {}
+    for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+        if pool_engine is None:
+            continue
+        stats = pool_engine.pool.stats()
+        values[(name, "checked_out")] = stats["checked_out"]
+        values[(name, "checked_in")] = stats["checked_in"]
+        values[(name, "overflow")] = stats["overflow"]
+    return values
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template, method and status.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ["method"]
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands by command name.",
+    ["command"],
+    buckets=REDIS_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by key namespace, tier and result.",
+    ["namespace", "tier", "result"],
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds",
+    "Time password hashing calls waited for a free worker.",
+)
+PASSWORD_HASH_CALLS = Counter(
+    "password_hash_calls_total",
+    "Password hashing calls by result, rejected when the queue is full.",
+    ["result"],
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending", "Password hashing calls waiting or running."
+)
+DB_POOL_CONNECTIONS = CallbackGauge(
+    "db_pool_connections",
+    "Connections of the SQLAlchemy pools by engine and state.",
+    ["engine", "state"],
+    _pool_connections,
+)
+
+
+def record_cache_lookup(key: str, tier: str, hit: bool) -> None:
+    """Counts a cache lookup under the namespace of its key, e.g. "school"."""
+    CACHE_REQUESTS.inc(key.split(":", 1)[0], tier, "hit" if hit else "miss")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and in-flight count of HTTP requests.
+
+    Requests are labelled with the route template, e.g. ``/schools/{school_id}``,
+    so the number of series stays bounded whatever IDs are requested.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method)
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                method,
+                route.path if route is not None else "<unmatched>",
+                str(status_code),
+                value=time.perf_counter() - started,
+            )
@@ -0,0 +1,75 @@
+import base64
+import binascii
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Cursor(NamedTuple):
+    """The position after which a page starts."""
+
+    id: UUID
+    # The last row's value of the sort column, for sorts on a column other
+    # than the ID; an empty string stands for NULL.
+    key: Optional[str] = None
+
+
+def encode_cursor(last_id: UUID, key: Optional[str] = None) -> str:
+    """Encodes the ID, and any sort key, of the last row of a page into an opaque cursor."""
+    raw = last_id.bytes if key is None else last_id.bytes + b":" + key.encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_sort_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    """
+    Dependency that decodes the ``cursor`` query parameter, sort key included.
+
+    Args:
+        cursor (str, optional): The opaque cursor returned by a previous page.
+
+    Returns:
+        Cursor: The position after which the next page starts, or None for the first page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = raw[16:]
+        if key and not key.startswith(b":"):
+            raise ValueError(cursor)
+        return Cursor(UUID(bytes=raw[:16]), key[1:].decode() if key else None)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_cursor(cursor: Optional[str] = None) -> Optional[UUID]:
+    """
+    Dependency that decodes the ``cursor`` query parameter.
+
+    Args:
+        cursor (str, optional): The opaque cursor returned by a previous page.
+
+    Returns:
+        UUID: The ID after which the next page starts, or None for the first page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    decoded = decode_sort_cursor(cursor)
+    return decoded.id if decoded is not None else None
+
+
+def next_cursor_headers(
+    rows: Sequence, limit: int, key: Optional[Callable[[Any], str]] = None
+) -> dict:
+    """Returns the header pointing to the next page, if there may be one."""
+    if not rows or len(rows) < limit:
+        return {}
+    last = rows[-1]
+    return {NEXT_CURSOR_HEADER: encode_cursor(last.id, key(last) if key else None)}
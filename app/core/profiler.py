@@ -0,0 +1,175 @@
+import asyncio
+import sys
+import threading
+import uuid
+from collections import Counter
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.deps.redis import redis_client
+from app.deps.user import get_token_payload
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_TTL_SECONDS = 3600
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler built on ``sys._current_frames``.
+
+    A background thread wakes up every ``interval`` seconds and records the
+    stack of the profiled thread, so the profiled code is never instrumented
+    and pays nothing beyond the GIL hand-offs. Stacks are aggregated in the
+    collapsed format ``root;caller;callee count`` read by flame graph tools.
+
+    The profiled thread is the event loop thread, so the samples cover every
+    task it runs, including concurrent requests.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stops sampling and returns the collapsed stacks, most sampled first."""
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+# At most one profiler runs per worker, which bounds the sampling overhead.
+_active: Optional[SamplingProfiler] = None
+_window_tasks: set = set()
+
+
+def start_profiler() -> SamplingProfiler:
+    """Starts sampling the calling thread, which must be the event loop thread."""
+    global _active
+    if _active is not None:
+        raise ProfilerBusy()
+    _active = SamplingProfiler(threading.get_ident(), settings.PROFILER_INTERVAL_MS / 1000)
+    _active.start()
+    return _active
+
+
+async def stop_profiler(profiler: SamplingProfiler, profile_id: str) -> None:
+    """Stops a profiler and stores its collapsed stacks under ``profile_id``."""
+    global _active
+    collapsed = await asyncio.to_thread(profiler.stop)
+    _active = None
+    await redis_client.setex(_profile_key(profile_id), PROFILE_TTL_SECONDS, collapsed)
+
+
+def _profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+
+async def get_profile(profile_id: str) -> Optional[str]:
+    """Returns the collapsed stacks of a finished profile."""
+    return await redis_client.get(_profile_key(profile_id))
+
+
+async def profile_window(seconds: float) -> str:
+    """
+    Profiles this worker for a time window in the background.
+
+    Returns:
+        str: The ID the profile will be stored under once the window closes.
+    """
+    profiler = start_profiler()
+    profile_id = uuid.uuid4().hex
+
+    async def run():
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await stop_profiler(profiler, profile_id)
+
+    task = asyncio.create_task(run())
+    _window_tasks.add(task)
+    task.add_done_callback(_window_tasks.discard)
+    return profile_id
+
+
+async def _is_admin(authorization: Optional[str]) -> bool:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = await get_token_payload(token)
+    except HTTPException:
+        return False
+    return payload["sub"] in settings.ADMIN_USERNAMES
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling single requests on demand.
+
+    A request sent by an admin with the ``X-Profile`` header is sampled while
+    it runs. The response carries an ``X-Profile-Id`` header, and the
+    collapsed stacks can be read from ``GET /admin/profiles/{profile_id}``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if PROFILE_HEADER.lower().encode() not in headers:
+            await self.app(scope, receive, send)
+            return
+        authorization = headers.get(b"authorization", b"").decode()
+        if not await _is_admin(authorization):
+            await self.app(scope, receive, send)
+            return
+        try:
+            profiler = start_profiler()
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER.lower().encode(), profile_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await stop_profiler(profiler, profile_id)
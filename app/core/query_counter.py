@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.database import engine as default_engine
+
+
+class QueryCounter:
+    """Counts the statements an engine runs, and the time they take, while attached."""
+
+    def __init__(self, engine: Union[Engine, AsyncEngine]):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_counter_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.seconds += time.perf_counter() - context._query_counter_started
+        self.statements.append(statement)
+
+    def attach(self) -> None:
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+
+    def detach(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+
+@contextmanager
+def count_queries(engine: Union[Engine, AsyncEngine] = default_engine) -> Iterator[QueryCounter]:
+    """Counts the statements run through an engine inside the block."""
+    counter = QueryCounter(engine)
+    counter.attach()
+    try:
+        yield counter
+    finally:
+        counter.detach()
+
+
+@contextmanager
+def assert_max_queries(
+    max_queries: int, engine: Union[Engine, AsyncEngine] = default_engine
+) -> Iterator[QueryCounter]:
+    """
+    Fails if the block runs more than ``max_queries`` statements.
+
+    Meant for tests, to pin down how many queries an endpoint may issue so
+    that N+1 regressions are caught:
+
+        with assert_max_queries(2):
+            client.get("/students/")
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, {counter.count} were run:\n{statements}"
+        )
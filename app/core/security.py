@@ -1,8 +1,17 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
+import asyncio
+import time
+import uuid
 
 from app.core.config import settings
+from app.core.metrics import (
+    PASSWORD_HASH_CALLS,
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_WAIT_SECONDS,
+)
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -11,6 +20,78 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already waiting for a worker."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so the workers hash in parallel.
+    At most ``max_queue`` calls may be waiting or running at once; beyond that
+    callers get ``PasswordHasherBusy`` instead of piling up behind a login
+    burst. The time each call spent waiting for a worker is recorded, and
+    exported at ``/metrics`` along with the queue depth and rejections.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_queue = max_queue
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+
+    async def run(self, func, *args):
+        """Runs ``func(*args)`` on the pool and returns its result."""
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            PASSWORD_HASH_CALLS.inc("rejected")
+            raise PasswordHasherBusy()
+
+        submitted_at = time.monotonic()
+
+        def timed_call():
+            wait = time.monotonic() - submitted_at
+            return wait, func(*args)
+
+        self.pending += 1
+        PASSWORD_HASH_PENDING.inc()
+        try:
+            wait, result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, timed_call
+            )
+        finally:
+            self.pending -= 1
+            PASSWORD_HASH_PENDING.dec()
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        PASSWORD_HASH_CALLS.inc("completed")
+        PASSWORD_HASH_WAIT_SECONDS.observe(value=wait)
+        return result
+
+    def stats(self) -> dict:
+        """Returns the queue depth and wait time counters of the pool."""
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
 def get_password_hash(password: str) -> str:
     """Hashes a password using bcrypt."""
     return pwd_context.hash(password)
@@ -21,11 +102,20 @@ def verify_password(plain_password, hashed_password) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def get_password_hash_async(password: str) -> str:
+    """Hashes a password using bcrypt on the password hashing pool."""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """Verifies a password on the password hashing pool."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
-    """Creates an access token."""
+    """Creates an access token with a unique ``jti`` so it can be revoked."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
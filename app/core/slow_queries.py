@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.timing import current_route
+from app.db.database import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Execution option that keeps the EXPLAIN statements out of the log.
+SKIP_SLOW_QUERY_LOG = "skip_slow_query_log"
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+_entries: Deque[dict] = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+_engines = {
+    async_engine.sync_engine: async_engine
+    for async_engine in (engine, replica_engine)
+    if async_engine is not None
+}
+_explain_tasks: set = set()
+
+
+def get_slow_queries() -> List[dict]:
+    """Returns the captured slow queries of this worker, newest first."""
+    return list(reversed(_entries))
+
+
+def clear_slow_queries() -> None:
+    _entries.clear()
+
+
+async def _explain(entry: dict, sync_engine, statement: str, parameters) -> None:
+    try:
+        async with _engines[sync_engine].connect() as conn:
+            conn = await conn.execution_options(**{SKIP_SLOW_QUERY_LOG: True})
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+        entry["explain"] = json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as exc:
+        logger.warning("Could not EXPLAIN slow query: %s", exc)
+        entry["explain_error"] = str(exc)
+
+
+def _schedule_explain(entry: dict, sync_engine, statement: str, parameters) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_explain(entry, sync_engine, statement, parameters))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+def _record(sync_engine, statement, parameters, context, executemany, error=None):
+    duration_ms = (time.perf_counter() - context._slow_query_started) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    if context.execution_options.get(SKIP_SLOW_QUERY_LOG):
+        return
+
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "route": current_route(),
+        "statement": statement,
+        "parameters": repr(parameters)[:1000],
+        "error": error,
+        "explain": None,
+    }
+    _entries.append(entry)
+    logger.warning(
+        "Slow query (%.1f ms) in %s%s: %s",
+        duration_ms,
+        entry["route"],
+        f" failed with {error}" if error else "",
+        statement,
+    )
+    if (
+        not executemany
+        and _EXPLAINABLE.match(statement)
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    ):
+        _schedule_explain(entry, sync_engine, statement, parameters)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn.engine, statement, parameters, context, executemany)
+
+
+def _handle_error(exception_context):
+    # Statements that raise never reach after_cursor_execute, and those
+    # cancelled by DB_STATEMENT_TIMEOUT_MS are the slowest of all.
+    context = exception_context.execution_context
+    if context is None or not hasattr(context, "_slow_query_started"):
+        return
+    _record(
+        exception_context.engine,
+        exception_context.statement,
+        exception_context.parameters,
+        context,
+        context.executemany,
+        error=repr(exception_context.original_exception)[:1000],
+    )
+
+
+for _sync_engine in _engines:
+    event.listen(_sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_sync_engine, "handle_error", _handle_error)
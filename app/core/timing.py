@@ -0,0 +1,146 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.database import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Per request: span name -> [total seconds, count].
+_spans: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("server_timing_spans", default=None)
+_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """Returns "METHOD /route/{template}" of the current request, if there is one."""
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+def record(name: str, seconds: float) -> None:
+    """Adds a duration to a span of the current request, if there is one."""
+    spans = _spans.get()
+    if spans is not None:
+        span = spans.setdefault(name, [0.0, 0])
+        span[0] += seconds
+        span[1] += 1
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Times a block of code as a span of the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def format_server_timing(spans: Dict[str, List[float]], total: float) -> str:
+    """Builds a ``Server-Timing`` header value, with durations in milliseconds."""
+    entries = [
+        f'{name};dur={seconds * 1000:.2f};desc="{count}x"'
+        for name, (seconds, count) in spans.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._server_timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record("db", time.perf_counter() - context._server_timing_started)
+
+
+for _engine in (engine, replica_engine):
+    if _engine is not None:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _warn_on_query_count(scope, spans: Dict[str, List[float]]) -> None:
+    seconds, queries = spans.get("db", (0.0, 0))
+    if queries > settings.QUERY_COUNT_WARNING_THRESHOLD:
+        route = scope.get("route")
+        logger.warning(
+            "%s %s ran %d queries (%.1f ms), above the threshold of %d; possible N+1",
+            scope["method"],
+            route.path if route is not None else scope["path"],
+            queries,
+            seconds * 1000,
+            settings.QUERY_COUNT_WARNING_THRESHOLD,
+        )
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that times the encoding of its body as the "render" span."""
+
+    def render(self, content) -> bytes:
+        with span("render"):
+            return super().render(content)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that reports where the time of each request went.
+
+    Database queries, Redis commands, authentication and serialization are
+    timed into request-scoped spans, sent back in a ``Server-Timing`` header
+    and, with ``SERVER_TIMING_LOG``, logged as one JSON line per request.
+    Requests running more than ``QUERY_COUNT_WARNING_THRESHOLD`` statements
+    are logged as a warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: Dict[str, List[float]] = {}
+        token = _spans.set(spans)
+        scope_token = _scope.set(scope)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                header = format_server_timing(spans, total)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+                if settings.SERVER_TIMING_LOG:
+                    logger.info(
+                        json.dumps(
+                            {
+                                "method": scope["method"],
+                                "path": scope["path"],
+                                "status": message["status"],
+                                "total_ms": round(total * 1000, 2),
+                                "spans": {
+                                    name: {"ms": round(seconds * 1000, 2), "count": count}
+                                    for name, (seconds, count) in spans.items()
+                                },
+                            }
+                        )
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _spans.reset(token)
+            _scope.reset(scope_token)
+            _warn_on_query_count(scope, spans)
@@ -1,10 +1,100 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker as sessionMarker
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from uuid import uuid4
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker as sessionMarker
 from app.core.config import settings
+from app.db.pool import TimedQueuePool
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+# Session.info flag marking a session whose reads may be served by the replica.
+USE_REPLICA = "use_replica"
+
+# Overrides USE_REPLICA for code that must see the latest writes.
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+
+
+@contextmanager
+def reading_from_primary() -> Iterator[None]:
+    """Sends every statement issued inside the block to the primary."""
+    token = _read_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+def _connect_args() -> dict:
+    cache_size = settings.DB_STATEMENT_CACHE_SIZE
+    connect_args = {
+        # asyncpg's own statement cache, and the separate prepared statement
+        # cache of SQLAlchemy's asyncpg adapter: both must be off behind
+        # PgBouncer in transaction mode.
+        "statement_cache_size": cache_size,
+        "prepared_statement_cache_size": cache_size,
+        "server_settings": {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        },
+    }
+    if cache_size == 0:
+        # Statements are still prepared, so give them names that cannot clash
+        # on a server connection shared through the pooler.
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return connect_args
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+
+
+engine = _create_engine(DATABASE_URL)
+replica_engine = (
+    _create_engine(settings.REPLICA_DATABASE_URL)
+    if settings.REPLICA_DATABASE_URL
+    else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the SELECTs of read-only sessions to the replica.
+
+    Everything else, including flushes, any statement issued by a session
+    not flagged with ``USE_REPLICA`` and anything run inside
+    ``reading_from_primary()``, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            replica_engine is not None
+            and self.info.get(USE_REPLICA)
+            and not _read_primary.get()
+            and not self._flushing
+            and (clause is None or isinstance(clause, Select))
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
 
 AsyncSessionLocal = sessionMarker(
-    bind=engine, expire_on_commit=False, class_=AsyncSession
+    expire_on_commit=False, class_=AsyncSession, sync_session_class=RoutingSession
 )
+
+
+def ReplicaSessionLocal() -> AsyncSession:
+    """Opens a session whose reads are served by the replica, if one is configured."""
+    return AsyncSessionLocal(info={USE_REPLICA: True})
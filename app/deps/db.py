@@ -1,8 +1,62 @@
-from app.db.database import AsyncSessionLocal
+from fastapi import Request, Response
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, USE_REPLICA, replica_engine
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Set after a client's write so its next reads see it despite replication lag.
+PRIMARY_STICKY_COOKIE = "db_primary"
 
-async def get_db() -> AsyncSession:
-    """Dependency that provides a database session."""
-    async with AsyncSessionLocal() as session:
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class LazySession:
+    """
+    Stands in for an AsyncSession until the request actually uses it.
+
+    The session, and with it the pooled connection it checks out on its first
+    query, is only created on first attribute access, so requests answered
+    from the cache never build a session or touch the pool.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = AsyncSessionLocal(**self._kwargs)
+        return getattr(self._session, name)
+
+    @property
+    def started(self) -> bool:
+        """Whether the underlying session was created."""
+        return self._session is not None
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+async def get_db(request: Request, response: Response) -> AsyncSession:
+    """
+    Dependency that provides a database session.
+
+    The session is created lazily, on first use. Safe requests read from the
+    replica when one is configured. Any other request uses the primary and
+    pins the client to it for ``REPLICA_STICKINESS_SECONDS``, so it reads its
+    own writes.
+    """
+    safe = request.method in SAFE_METHODS
+    if not safe and replica_engine is not None:
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            "1",
+            max_age=settings.REPLICA_STICKINESS_SECONDS,
+            httponly=True,
+        )
+    use_replica = safe and PRIMARY_STICKY_COOKIE not in request.cookies
+    session = LazySession(info={USE_REPLICA: use_replica})
+    try:
         yield session
+    finally:
+        await session.close()
@@ -1,11 +1,29 @@
+import time
+
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.metrics import REDIS_COMMAND_SECONDS
+from app.core.timing import record
 
 REDIS_HOST = settings.REDIS_HOST
 REDIS_PORT = settings.REDIS_PORT
 
-redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records the latency of every command it sends."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            elapsed = time.perf_counter() - started
+            REDIS_COMMAND_SECONDS.observe(str(args[0]), value=elapsed)
+            record("redis", elapsed)
+
+
+redis_client = InstrumentedRedis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
 
 async def get_redis_client():
     """Returns a Redis client instance."""
-    return redis_client
\ No newline at end of file
+    return redis_client
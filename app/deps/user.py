@@ -2,34 +2,65 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
+from app.core.config import settings
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.timing import span
 from app.deps.db import get_db
-from app.user.model import User
+from app.user.schema import UserOut
+from app.user import service as user_service
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    """Retrieves the current authenticated user from the token."""
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Decodes the bearer token and rejects it if it was revoked or its user disabled."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("auth"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    result = await db.execute(select(User).filter(User.username == username))
-    user = result.scalar_one_or_none()
-    if user is None:
+    if await user_service.is_access_revoked(username, payload.get("jti")):
         raise credentials_exception
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload), db: AsyncSession = Depends(get_db)
+) -> UserOut:
+    """
+    Retrieves the current authenticated user from the token.
+
+    Tokens carry the user's id and email, so the user is built from the claims
+    without touching the database. Tokens issued before those claims existed
+    fall back to a cached lookup by username.
+    """
+    username = payload["sub"]
+    if "uid" in payload and "email" in payload:
+        return UserOut(id=payload["uid"], username=username, email=payload["email"])
+
+    user = await user_service.get_user_by_username(db, username)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
     return user
+
+
+async def get_admin_user(current_user: UserOut = Depends(get_current_user)) -> UserOut:
+    """Restricts an endpoint to the users listed in ``ADMIN_USERNAMES``."""
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
+        )
+    return current_user
@@ -0,0 +1,72 @@
+import logging
+from types import MappingProxyType
+from typing import Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from .model import DocumentType
+from app.core.cache import invalidate_namespace, listen
+from app.db.database import AsyncSessionLocal
+from app.deps.redis import redis_client
+from app.student.schema import DocumentTypeOut
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TYPES_CHANNEL = "document_types:changed"
+
+# Document types are a handful of seeded rows, so the whole table is kept in
+# an immutable in-process registry. Reloads swap in a new mapping at once, so
+# readers never see a half-built registry.
+_registry: Mapping[UUID, DocumentTypeOut] = MappingProxyType({})
+
+
+async def load_document_types(db: AsyncSession) -> None:
+    """Reads every document type into the registry."""
+    global _registry
+    result = await db.execute(select(DocumentType))
+    _registry = MappingProxyType(
+        {
+            document_type.id: DocumentTypeOut.model_validate(document_type)
+            for document_type in result.scalars().all()
+        }
+    )
+
+
+def get_document_types() -> Mapping[UUID, DocumentTypeOut]:
+    """Returns the current registry of document types by ID."""
+    return _registry
+
+
+async def get_document_type(db: AsyncSession, document_type_id: UUID) -> Optional[DocumentTypeOut]:
+    """
+    Looks up a document type in the registry.
+
+    The registry is only reloaded if the ID is unknown, which can happen for a
+    type inserted since the last reload whose notification was missed.
+    """
+    if document_type_id not in _registry:
+        await load_document_types(db)
+    return _registry.get(document_type_id)
+
+
+async def notify_document_types_changed() -> None:
+    """Tells every worker to reload its registry."""
+    await redis_client.publish(DOCUMENT_TYPES_CHANNEL, "")
+
+
+async def _reload_document_types(message: Optional[str] = None) -> None:
+    previous = _registry
+    async with AsyncSessionLocal() as db:
+        await load_document_types(db)
+    if _registry != previous:
+        # Cached student pages and ETags embed the document types. Every
+        # worker bumps after its own reload, so the last bump comes after the
+        # last worker stopped rendering the old names.
+        await invalidate_namespace("students")
+
+
+async def listen_for_document_type_changes() -> None:
+    """Reloads the registry whenever a change is announced."""
+    await listen(DOCUMENT_TYPES_CHANNEL, _reload_document_types, on_subscribe=_reload_document_types)
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from .schema import InvoiceCreate, InvoiceOut
+from .schema import InvoiceCreate, InvoiceFilter, InvoiceOut
 from . import service as invoice_service
 from app.deps.db import get_db
 from app.deps.user import get_current_user
-from app.user.model import User
+from app.core.pagination import Cursor, decode_sort_cursor
+from app.core.export import ExportFormat
+from app.core.bulk import BulkCreateResult
+from app.core.cache import detail_etag
+from app.core.etag import etag_matches, not_modified
+from app.core.config import settings
+from app.user.schema import UserOut
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
@@ -16,33 +22,80 @@ router = APIRouter(prefix="/invoices", tags=["Invoices"])
 async def create_invoice(
     invoice: InvoiceCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
     """Create a new invoice."""
     return await invoice_service.create_invoice(db, invoice)
 
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_invoices_bulk(
+    rows: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Create a batch of invoices, reporting the rows that could not be created."""
+    if len(rows) > settings.BULK_CREATE_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.BULK_CREATE_MAX_ROWS} rows",
+        )
+    return await invoice_service.create_invoices_bulk(db, rows)
+
+
 @router.get("/", response_model=List[InvoiceOut])
 async def read_invoices(
     skip: int = 0,
     limit: int = 10,
+    after: Optional[Cursor] = Depends(decode_sort_cursor),
+    filters: InvoiceFilter = Depends(),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Retrieve a list of invoices filtered by status, school and due-date range."""
+    return await invoice_service.get_invoices_response(
+        db, skip, limit, after, filters, if_none_match
+    )
+
+
+@router.get("/batch", response_model=List[InvoiceOut])
+async def read_invoices_batch(
+    ids: List[UUID] = Query(..., max_length=settings.BATCH_MAX_IDS),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Retrieve several invoices at once, in the order of the repeated ``ids`` parameter."""
+    return await invoice_service.get_invoices_batch(db, ids)
+
+
+@router.get("/export")
+async def export_invoices(
+    format: ExportFormat = "ndjson",
+    current_user: UserOut = Depends(get_current_user),
 ):
-    """Retrieve a list of invoices."""
-    return await invoice_service.get_invoices(db, skip, limit)
+    """Stream every invoice as NDJSON or CSV."""
+    return invoice_service.export_invoices(format)
 
 
 @router.get("/{invoice_id}", response_model=InvoiceOut)
 async def read_invoice(
     invoice_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
-    """Retrieve a single invoice by ID."""
+    """Retrieve a single invoice by ID, or a 304 if the client's ETag is current."""
+    etag = await detail_etag("invoices", invoice_id)
+    if etag_matches(if_none_match, etag, wildcard=False):
+        return not_modified(etag)
     invoice = await invoice_service.get_invoice(db, invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return invoice
 
 
@@ -50,7 +103,7 @@ async def read_invoice(
 async def delete_invoice(
     invoice_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
     """Delete an invoice by ID."""
     invoice = await invoice_service.delete_invoice(db, invoice_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Date, String, ForeignKey
+from sqlalchemy import Column, Float, Date, String, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -15,3 +15,14 @@ class Invoice(Base):
     status = Column(String, default="pending")
     school_id = Column(UUID(as_uuid=True), ForeignKey("schools.id", ondelete="CASCADE"))
     school = relationship("School", back_populates="invoices")
+
+    __table_args__ = (
+        Index("ix_invoices_school_id_status_due_date", "school_id", "status", "due_date", "id"),
+        Index("ix_invoices_due_date", "due_date", "id"),
+        Index(
+            "ix_invoices_pending_due_date",
+            "due_date",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
@@ -1,13 +1,17 @@
 from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import date
-from typing import Literal
+from typing import Literal, Optional
+
+
+InvoiceStatus = Literal["pending", "paid", "cancelled"]
+InvoiceSort = Literal["id", "due_date", "-due_date"]
 
 
 class InvoiceBase(BaseModel):
     amount: float
     due_date: date = Field(default_factory=date.today)
-    status: Literal["pending", "paid", "cancelled"] = "pending"
+    status: InvoiceStatus = "pending"
     school_id: UUID
 
 
@@ -17,6 +21,16 @@ class InvoiceCreate(InvoiceBase):
 
 class InvoiceOut(InvoiceBase):
     id: UUID
+    # The column is nullable, so stored invoices may have no due date.
+    due_date: Optional[date] = None
 
     class Config:
         from_attributes = True
+
+
+class InvoiceFilter(BaseModel):
+    status: Optional[InvoiceStatus] = None
+    school_id: Optional[UUID] = None
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+    sort: InvoiceSort = "id"
@@ -1,59 +1,228 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, or_, tuple_
 from sqlalchemy.future import select
-from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date
+from uuid import UUID, uuid4
+from typing import List, Optional
 from .model import Invoice
-from .schema import InvoiceCreate, InvoiceOut
-import json
-from app.deps.redis import redis_client
+from .schema import InvoiceCreate, InvoiceFilter, InvoiceOut
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from app.core.pagination import Cursor, next_cursor_headers
+from app.core.export import ExportFormat, export_response
+from app.core.serialization import dump_list
+from app.db.database import ReplicaSessionLocal
+from app.core.bulk import (
+    BulkCreateResult,
+    BulkRowError,
+    chunked,
+    existing_values,
+    validate_rows,
+)
+from app.school.model import School
+from app.core.cache import (
+    cache_aside,
+    cache_aside_many,
+    cache_delete,
+    cache_set,
+    cached_response,
+    entity_cache_key,
+    entity_key,
+    invalidate_namespace,
+    list_cache_key,
+)
 
 
 async def create_invoice(db: AsyncSession, invoice: InvoiceCreate) -> Invoice:
-    """Creates a new invoice in the database."""
-    db_invoice = Invoice(**invoice.model_dump())
-    db.add(db_invoice)
+    """Creates a new invoice in the database with a single INSERT ... RETURNING."""
+    result = await db.execute(
+        insert(Invoice).values(id=uuid4(), **invoice.model_dump()).returning(Invoice)
+    )
+    db_invoice = result.scalar_one()
     await db.commit()
-    await db.refresh(db_invoice)
-    # Invalidate cache for all invoices and specific invoice
-    await redis_client.delete(f"invoice:{db_invoice.id}")
-    await redis_client.delete(*await redis_client.keys("invoices:*"))
+    await invalidate_namespace("invoices")
     return db_invoice
 
 
-async def get_invoices(db: AsyncSession, skip: int = 0, limit: int = 10):
-    """Retrieves a list of invoices from the database, with caching."""
-    cache_key = f"invoices:skip={skip}:limit={limit}"
-    cached_invoices = await redis_client.get(cache_key)
-    if cached_invoices:
-        return [InvoiceOut.model_validate_json(invoice) for invoice in json.loads(cached_invoices)]
+async def create_invoices_bulk(db: AsyncSession, rows: list[dict]) -> BulkCreateResult:
+    """
+    Validates and inserts a batch of invoices using multi-row INSERTs.
 
-    result = await db.execute(select(Invoice).offset(skip).limit(limit))
-    db_invoices = result.scalars().all()
-    if db_invoices:
-        await redis_client.setex(cache_key, 3600, json.dumps([InvoiceOut.model_validate(invoice).model_dump_json() for invoice in db_invoices]))
-    return db_invoices
+    Invalid rows and rows referencing a missing school are reported by their
+    index instead of failing the whole batch. The list cache is invalidated
+    once per batch.
+    """
+    invoices, errors = validate_rows(rows, InvoiceCreate)
+    existing_schools = await existing_values(
+        db, School.id, {invoice.school_id for _, invoice in invoices}
+    )
+
+    pending = []
+    for index, invoice in invoices:
+        if invoice.school_id not in existing_schools:
+            errors.append(BulkRowError(index=index, detail="School not found"))
+        else:
+            pending.append((index, {"id": uuid4(), **invoice.model_dump()}))
+
+    if pending:
+        for chunk in chunked(pending):
+            await db.execute(insert(Invoice).values([values for _, values in chunk]))
+        await db.commit()
+        await invalidate_namespace("invoices")
+
+    errors.sort(key=lambda error: error.index)
+    ids = [values["id"] for _, values in pending]
+    return BulkCreateResult(created=len(ids), ids=ids, errors=errors)
+
+
+def _due_date_key(invoice: Invoice) -> str:
+    return invoice.due_date.isoformat() if invoice.due_date is not None else ""
+
+
+def _cursor_due_date(after: Cursor) -> Optional[date]:
+    if after.key is None:
+        # A cursor from an ID-sorted page does not say where to resume.
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return date.fromisoformat(after.key) if after.key else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _filtered_invoices_query(
+    filters: InvoiceFilter, after: Optional[Cursor] = None
+) -> Select:
+    query = select(Invoice)
+    if filters.status is not None:
+        query = query.where(Invoice.status == filters.status)
+    if filters.school_id is not None:
+        query = query.where(Invoice.school_id == filters.school_id)
+    if filters.due_from is not None:
+        query = query.where(Invoice.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        query = query.where(Invoice.due_date <= filters.due_to)
+
+    if filters.sort == "id":
+        if after is not None:
+            query = query.where(Invoice.id > after.id)
+        return query.order_by(Invoice.id)
+
+    # Invoices without a due date come after every dated one, and so first in
+    # descending order, which keeps both directions a scan of the
+    # (due_date, id) index. The cursor carries the (due_date, id) of the last
+    # row, and the seek handles NULL dates explicitly since a row comparison
+    # with NULL is never true.
+    descending = filters.sort.startswith("-")
+    if after is not None:
+        due_date = _cursor_due_date(after)
+        key = tuple_(Invoice.due_date, Invoice.id)
+        if descending and due_date is None:
+            query = query.where(
+                or_(
+                    and_(Invoice.due_date.is_(None), Invoice.id < after.id),
+                    Invoice.due_date.is_not(None),
+                )
+            )
+        elif descending:
+            query = query.where(key < tuple_(due_date, after.id))
+        elif due_date is None:
+            query = query.where(Invoice.due_date.is_(None), Invoice.id > after.id)
+        else:
+            query = query.where(
+                or_(key > tuple_(due_date, after.id), Invoice.due_date.is_(None))
+            )
+    if descending:
+        return query.order_by(Invoice.due_date.desc().nulls_first(), Invoice.id.desc())
+    return query.order_by(Invoice.due_date.asc().nulls_last(), Invoice.id)
+
+
+async def get_invoices(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[Cursor] = None,
+    filters: Optional[InvoiceFilter] = None,
+):
+    """Retrieves a filtered, sorted list of invoices, optionally after a given cursor."""
+    query = _filtered_invoices_query(filters or InvoiceFilter(), after)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_invoices_response(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[Cursor] = None,
+    filters: Optional[InvoiceFilter] = None,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """Retrieves a list of invoices as a pre-serialized JSON response, with caching and an ETag."""
+    filters = filters or InvoiceFilter()
+    cache_key = await list_cache_key(
+        "invoices",
+        after=after.id if after else None,
+        after_key=after.key if after else None,
+        skip=skip,
+        limit=limit,
+        **filters.model_dump(),
+    )
+    cursor_key = None if filters.sort == "id" else _due_date_key
+
+    async def render():
+        db_invoices = await get_invoices(db, skip, limit, after, filters)
+        body = dump_list(InvoiceOut, db_invoices)
+        return body, next_cursor_headers(db_invoices, limit, cursor_key)
+
+    return await cached_response(cache_key, render, if_none_match)
 
 
 async def get_invoice(db: AsyncSession, invoice_id: UUID):
     """Retrieves a single invoice by its ID, with caching."""
-    cache_key = f"invoice:{invoice_id}"
-    cached_invoice = await redis_client.get(cache_key)
-    if cached_invoice:
-        return InvoiceOut.model_validate_json(cached_invoice)
+    cache_key = await entity_cache_key("invoice", invoice_id)
 
-    result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
-    db_invoice = result.scalar_one_or_none()
-    if db_invoice:
-        await redis_client.setex(cache_key, 3600, InvoiceOut.model_validate(db_invoice).model_dump_json())
-    return db_invoice
+    async def load():
+        result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
+        db_invoice = result.scalar_one_or_none()
+        if db_invoice:
+            await cache_set(cache_key, InvoiceOut.model_validate(db_invoice).model_dump_json())
+        return db_invoice
+
+    return await cache_aside(cache_key, load, InvoiceOut.model_validate_json, "invoices")
+
+
+async def get_invoices_batch(db: AsyncSession, invoice_ids: List[UUID]) -> List[InvoiceOut]:
+    """Retrieves several invoices by their IDs, with caching, in the order requested."""
+
+    async def load(missing_ids):
+        result = await db.execute(select(Invoice).where(Invoice.id.in_(missing_ids)))
+        return {invoice.id: InvoiceOut.model_validate(invoice) for invoice in result.scalars().all()}
+
+    return await cache_aside_many(
+        invoice_ids,
+        await entity_key("invoice"),
+        load,
+        InvoiceOut.model_validate_json,
+        InvoiceOut.model_dump_json,
+        "invoices",
+    )
 
 
 async def delete_invoice(db: AsyncSession, invoice_id: UUID):
     """Deletes an invoice from the database by its ID."""
-    invoice = await get_invoice(db, invoice_id)
+    result = await db.execute(select(Invoice).where(Invoice.id == invoice_id))
+    invoice = result.scalar_one_or_none()
     if invoice:
         await db.delete(invoice)
         await db.commit()
         # Invalidate cache for the deleted invoice and all invoices
-        await redis_client.delete(f"invoice:{invoice_id}")
-        await redis_client.delete(*await redis_client.keys("invoices:*"))
+        await cache_delete(await entity_cache_key("invoice", invoice_id))
+        await invalidate_namespace("invoices")
     return invoice
+
+
+def export_invoices(export_format: ExportFormat) -> StreamingResponse:
+    """Streams every invoice as NDJSON or CSV, ordered by ID."""
+    query = select(Invoice.__table__).order_by(Invoice.id)
+    return export_response(ReplicaSessionLocal, query, export_format, "invoices")
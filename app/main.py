@@ -1,36 +1,70 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from app.school import controller as school_controller
 from app.user import controller as user_controller
 from app.student import controller as student_controller
 from app.invoice import controller as invoice_controller
+from app.admin import controller as admin_controller
 from app.db.database import engine
 from app.db.base import Base
 from app.core.exceptions import register_exception_handlers
+from app.core.cache import listen_for_invalidations
+from app.core import metrics
+from app.core.timing import ServerTimingMiddleware, TimedORJSONResponse
+from app.core.profiler import ProfilerMiddleware
+from app.db.database import AsyncSessionLocal
+from app.document_type.service import (
+    listen_for_document_type_changes,
+    load_document_types,
+)
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=TimedORJSONResponse)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Handles application startup events."""
-    pass
+    app.state.cache_listener = asyncio.create_task(listen_for_invalidations())
+    async with AsyncSessionLocal() as db:
+        await load_document_types(db)
+    app.state.document_type_listener = asyncio.create_task(
+        listen_for_document_type_changes()
+    )
     # async with engine.begin() as conn:
     #     await conn.run_sync(Base.metadata.create_all)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Handles application shutdown events."""
+    app.state.cache_listener.cancel()
+    app.state.document_type_listener.cancel()
+
+
 register_exception_handlers(app)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 app.include_router(school_controller.router)
 app.include_router(user_controller.router)
 app.include_router(student_controller.router)
 app.include_router(invoice_controller.router)
+app.include_router(admin_controller.router)
 
 
 @app.get("/")
 async def root():
     """Root endpoint for the API."""
     return {"message": "Mattilda API en local!"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Exposes the application metrics in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
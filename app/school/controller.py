@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.deps.db import get_db
 from app.deps.user import get_current_user
-from app.user.model import User
-from .schema import SchoolCreate, SchoolRead
+from app.core.cache import detail_etag
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified
+from app.core.pagination import decode_cursor
+from app.user.schema import UserOut
+from .schema import SchoolCreate, SchoolPurgeStatus, SchoolRead
 from . import service as school_service
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 router = APIRouter(prefix="/schools", tags=["Schools"])
@@ -15,7 +19,7 @@ router = APIRouter(prefix="/schools", tags=["Schools"])
 @router.post("/", response_model=SchoolRead)
 async def create_school(
     school: SchoolCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -33,40 +37,82 @@ async def create_school(
 
 @router.get("/", response_model=List[SchoolRead])
 async def read_schools(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[UUID] = Depends(decode_cursor),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve a list of schools.
 
+    Pass the ``X-Next-Cursor`` header of a page as the ``cursor`` query
+    parameter to fetch the following page.
+
     Args:
         skip (int): Number of records to skip.
         limit (int): Maximum number of records to retrieve.
+        after (UUID, optional): The decoded ``cursor`` query parameter.
+        if_none_match (str, optional): The ETag of the client's copy.
         db (AsyncSession): The database session.
 
     Returns:
-        List[SchoolRead]: A list of schools.
+        List[SchoolRead]: A list of schools, or a 304 if the client's copy is current.
     """
-    return await school_service.get_schools(db, skip=skip, limit=limit)
+    return await school_service.get_schools_response(
+        db, skip=skip, limit=limit, after=after, if_none_match=if_none_match
+    )
+
+
+@router.get("/batch", response_model=List[SchoolRead])
+async def read_schools_batch(
+    ids: List[UUID] = Query(..., max_length=settings.BATCH_MAX_IDS),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieve several schools by their IDs in one request.
+
+    Args:
+        ids (List[UUID]): The IDs to retrieve, as a repeated ``ids`` query parameter.
+        db (AsyncSession): The database session.
+
+    Returns:
+        List[SchoolRead]: The schools found, in the order requested; unknown IDs are skipped.
+    """
+    return await school_service.get_schools_batch(db, ids)
 
 
 @router.get("/{school_id}", response_model=SchoolRead)
-async def read_school(school_id: UUID, db: AsyncSession = Depends(get_db)):
+async def read_school(
+    school_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Retrieve a single school by its ID.
 
     Args:
         school_id (UUID): The ID of the school to retrieve.
+        response (Response): Carries the ``ETag`` of the school.
+        if_none_match (str, optional): The ETag of the client's copy.
         db (AsyncSession): The database session.
 
     Returns:
-        SchoolRead: The retrieved school.
+        SchoolRead: The retrieved school, or a 304 if the client's copy is current.
 
     Raises:
         HTTPException: If the school is not found.
     """
+    etag = await detail_etag("schools", school_id)
+    if etag_matches(if_none_match, etag, wildcard=False):
+        return not_modified(etag)
     db_school = await school_service.get_school(db, school_id)
     if not db_school:
         raise HTTPException(status_code=404, detail="School not found")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return db_school
 
 
@@ -89,3 +135,56 @@ async def delete_school(school_id: UUID, db: AsyncSession = Depends(get_db)):
     if not db_school:
         raise HTTPException(status_code=404, detail="School not found")
     return db_school
+
+
+@router.post(
+    "/{school_id}/purge",
+    response_model=SchoolPurgeStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def purge_school(
+    school_id: UUID,
+    current_user: UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a very large school in the background, in chunks.
+
+    Args:
+        school_id (UUID): The ID of the school to purge.
+        db (AsyncSession): The database session.
+
+    Returns:
+        SchoolPurgeStatus: The purge job, whose progress can be followed at
+            ``/schools/purges/{job_id}``.
+
+    Raises:
+        HTTPException: If the school is not found.
+    """
+    purge = await school_service.start_school_purge(db, school_id)
+    if not purge:
+        raise HTTPException(status_code=404, detail="School not found")
+    school_service.schedule_school_purge(purge)
+    return purge
+
+
+@router.get("/purges/{job_id}", response_model=SchoolPurgeStatus)
+async def read_school_purge(
+    job_id: UUID, current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Retrieve the progress of a school purge.
+
+    Args:
+        job_id (UUID): The ID of the purge job.
+
+    Returns:
+        SchoolPurgeStatus: The purge progress.
+
+    Raises:
+        HTTPException: If the purge job is not found.
+    """
+    purge = await school_service.get_school_purge(job_id)
+    if not purge:
+        raise HTTPException(status_code=404, detail="Purge not found")
+    return purge
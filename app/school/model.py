@@ -14,5 +14,11 @@ class School(Base):
     name = Column(String, unique=True, nullable=False)
     address = Column(String, nullable=True)
 
-    students = relationship("Student", back_populates="school", cascade="all, delete")
-    invoices = relationship("Invoice", back_populates="school", cascade="all, delete")
+    # Children are removed by the ON DELETE CASCADE foreign keys, so deleting
+    # a school never loads its students or invoices into the session.
+    students = relationship(
+        "Student", back_populates="school", cascade="all, delete", passive_deletes=True
+    )
+    invoices = relationship(
+        "Invoice", back_populates="school", cascade="all, delete", passive_deletes=True
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from uuid import UUID
-from typing import Optional
+from typing import Literal, Optional
 
 
 class SchoolBase(BaseModel):
@@ -17,3 +17,13 @@ class SchoolRead(SchoolBase):
 
     class Config:
         from_attributes = True
+
+
+class SchoolPurgeStatus(BaseModel):
+    job_id: UUID
+    school_id: UUID
+    status: Literal["pending", "running", "completed", "failed"]
+    students_total: int = 0
+    students_deleted: int = 0
+    invoices_total: int = 0
+    invoices_deleted: int = 0
@@ -1,10 +1,38 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, insert
 from sqlalchemy.future import select
 from .model import School
-from .schema import SchoolCreate, SchoolRead
+from .schema import SchoolCreate, SchoolPurgeStatus, SchoolRead
+import asyncio
+import contextvars
 import uuid
-import json
+import logging
+from typing import List, Optional
+from fastapi import Response
+from app.core.pagination import next_cursor_headers
+from app.core.config import settings
+from app.core.serialization import dump_list
+from app.db.database import AsyncSessionLocal
 from app.deps.redis import redis_client
+from app.invoice.model import Invoice
+from app.student.model import Student
+from app.core.cache import (
+    cache_aside,
+    cache_aside_many,
+    cache_delete,
+    cache_set,
+    cached_response,
+    entity_key,
+    invalidate_entities,
+    invalidate_namespace,
+    list_cache_key,
+)
+
+logger = logging.getLogger(__name__)
+
+PURGE_STATUS_TTL_SECONDS = 86400
+
+_purge_tasks: set = set()
 
 
 async def get_school(db: AsyncSession, school_id: uuid.UUID):
@@ -19,39 +47,98 @@ async def get_school(db: AsyncSession, school_id: uuid.UUID):
         School: The retrieved school, or None if not found.
     """
     cache_key = f"school:{school_id}"
-    cached_school = await redis_client.get(cache_key)
-    if cached_school:
-        return SchoolRead.model_validate_json(cached_school)
 
-    result = await db.execute(select(School).where(School.id == school_id))
-    db_school = result.scalars().first()
-    if db_school:
-        await redis_client.setex(cache_key, 3600, SchoolRead.model_validate(db_school).model_dump_json())
-    return db_school
+    async def load():
+        result = await db.execute(select(School).where(School.id == school_id))
+        db_school = result.scalars().first()
+        if db_school:
+            await cache_set(cache_key, SchoolRead.model_validate(db_school).model_dump_json())
+        return db_school
+
+    return await cache_aside(cache_key, load, SchoolRead.model_validate_json, "schools")
+
+
+async def get_schools_batch(db: AsyncSession, school_ids: List[uuid.UUID]) -> List[SchoolRead]:
+    """
+    Retrieve several schools by their IDs, with caching.
+
+    Args:
+        db (AsyncSession): The database session.
+        school_ids (List[uuid.UUID]): The IDs of the schools to retrieve.
+
+    Returns:
+        List[SchoolRead]: The schools found, in the order of ``school_ids``.
+    """
+
+    async def load(missing_ids):
+        result = await db.execute(select(School).where(School.id.in_(missing_ids)))
+        return {school.id: SchoolRead.model_validate(school) for school in result.scalars().all()}
 
+    return await cache_aside_many(
+        school_ids,
+        lambda school_id: f"school:{school_id}",
+        load,
+        SchoolRead.model_validate_json,
+        SchoolRead.model_dump_json,
+        "schools",
+    )
 
-async def get_schools(db: AsyncSession, skip: int = 0, limit: int = 10):
+
+async def get_schools(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[uuid.UUID] = None,
+):
     """
-    Retrieve a list of schools, with caching.
+    Retrieve a list of schools ordered by ID.
 
     Args:
         db (AsyncSession): The database session.
         skip (int): Number of records to skip.
         limit (int): Maximum number of records to retrieve.
+        after (uuid.UUID, optional): Only return schools whose ID sorts after this one.
 
     Returns:
         List[School]: A list of schools.
     """
-    cache_key = f"schools:skip={skip}:limit={limit}"
-    cached_schools = await redis_client.get(cache_key)
-    if cached_schools:
-        return [SchoolRead.model_validate_json(school) for school in json.loads(cached_schools)]
+    query = select(School).order_by(School.id)
+    if after is not None:
+        query = query.where(School.id > after)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
-    result = await db.execute(select(School).offset(skip).limit(limit))
-    db_schools = result.scalars().all()
-    if db_schools:
-        await redis_client.setex(cache_key, 3600, json.dumps([SchoolRead.model_validate(school).model_dump_json() for school in db_schools]))
-    return db_schools
+
+async def get_schools_response(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[uuid.UUID] = None,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Retrieve a list of schools as a pre-serialized JSON response, with caching.
+
+    Args:
+        db (AsyncSession): The database session.
+        skip (int): Number of records to skip.
+        limit (int): Maximum number of records to retrieve.
+        after (uuid.UUID, optional): Only return schools whose ID sorts after this one.
+        if_none_match (str, optional): The request's ``If-None-Match`` header.
+
+    Returns:
+        Response: The JSON array of schools, with the cursor of the next page
+            in the ``X-Next-Cursor`` header and an ``ETag``, or a 304 response
+            if the client's copy is current.
+    """
+    cache_key = await list_cache_key("schools", after=after, skip=skip, limit=limit)
+
+    async def render():
+        db_schools = await get_schools(db, skip=skip, limit=limit, after=after)
+        body = dump_list(SchoolRead, db_schools)
+        return body, next_cursor_headers(db_schools, limit)
+
+    return await cached_response(cache_key, render, if_none_match)
 
 
 async def create_school(db: AsyncSession, school: SchoolCreate):
@@ -63,16 +150,14 @@ async def create_school(db: AsyncSession, school: SchoolCreate):
         school (SchoolCreate): The school data to create.
 
     Returns:
-        School: The created school.
+        School: The created school, as returned by a single INSERT ... RETURNING.
     """
-    db_school = School(**school.model_dump())
-    db.add(db_school)
+    result = await db.execute(
+        insert(School).values(id=uuid.uuid4(), **school.model_dump()).returning(School)
+    )
+    db_school = result.scalar_one()
     await db.commit()
-    await db.refresh(db_school)
-    # Invalidate cache for all schools and specific school
-    await redis_client.delete(f"school:{db_school.id}")
-    # Invalidate all 'get_schools' caches (more robust invalidation might be needed for large datasets)
-    await redis_client.delete(*await redis_client.keys("schools:*"))
+    await invalidate_namespace("schools")
     return db_school
 
 
@@ -80,6 +165,10 @@ async def delete_school(db: AsyncSession, school_id: uuid.UUID):
     """
     Delete a school by its ID.
 
+    The school's students and invoices are removed by the database through
+    the ON DELETE CASCADE foreign keys, without loading them into the session,
+    and their cached entries are dropped by bumping the entity generations.
+
     Args:
         db (AsyncSession): The database session.
         school_id (uuid.UUID): The ID of the school to delete.
@@ -92,7 +181,146 @@ async def delete_school(db: AsyncSession, school_id: uuid.UUID):
     if db_school:
         await db.delete(db_school)
         await db.commit()
-        # Invalidate cache for the deleted school and all schools
-        await redis_client.delete(f"school:{school_id}")
-        await redis_client.delete(*await redis_client.keys("schools:*"))
+        # Invalidate cache for the deleted rows and every list they appeared in
+        await cache_delete(f"school:{school_id}")
+        await _invalidate_school_namespaces()
     return db_school
+
+
+async def _delete_cached_entries(prefix: str, ids) -> None:
+    if ids:
+        key = await entity_key(prefix)
+        await cache_delete(*(key(entity_id) for entity_id in ids))
+
+
+async def _invalidate_school_namespaces():
+    await invalidate_entities("student")
+    await invalidate_entities("invoice")
+    await invalidate_namespace("schools")
+    await invalidate_namespace("students")
+    await invalidate_namespace("invoices")
+
+
+def _purge_key(job_id: uuid.UUID) -> str:
+    return f"school_purge:{job_id}"
+
+
+async def _save_purge_status(purge: SchoolPurgeStatus) -> None:
+    await redis_client.setex(_purge_key(purge.job_id), PURGE_STATUS_TTL_SECONDS, purge.model_dump_json())
+
+
+async def start_school_purge(db: AsyncSession, school_id: uuid.UUID) -> Optional[SchoolPurgeStatus]:
+    """
+    Register an asynchronous purge of a school.
+
+    Args:
+        db (AsyncSession): The database session.
+        school_id (uuid.UUID): The ID of the school to purge.
+
+    Returns:
+        SchoolPurgeStatus: The pending purge job, or None if the school is not found.
+    """
+    result = await db.execute(select(School.id).where(School.id == school_id))
+    if result.scalar_one_or_none() is None:
+        return None
+
+    purge = SchoolPurgeStatus(job_id=uuid.uuid4(), school_id=school_id, status="pending")
+    await _save_purge_status(purge)
+    return purge
+
+
+async def get_school_purge(job_id: uuid.UUID) -> Optional[SchoolPurgeStatus]:
+    """
+    Retrieve the progress of a school purge.
+
+    Args:
+        job_id (uuid.UUID): The ID of the purge job.
+
+    Returns:
+        SchoolPurgeStatus: The purge progress, or None if the job is unknown or expired.
+    """
+    cached_purge = await redis_client.get(_purge_key(job_id))
+    if not cached_purge:
+        return None
+    return SchoolPurgeStatus.model_validate_json(cached_purge)
+
+
+async def _delete_in_chunks(session: AsyncSession, table, school_id: uuid.UUID, on_progress) -> None:
+    chunk_size = settings.SCHOOL_PURGE_CHUNK_SIZE
+    while True:
+        chunk = select(table.c.id).where(table.c.school_id == school_id).limit(chunk_size)
+        result = await session.execute(
+            delete(table).where(table.c.id.in_(chunk.scalar_subquery())).returning(table.c.id)
+        )
+        deleted_ids = result.scalars().all()
+        await session.commit()
+        await on_progress(deleted_ids)
+        if len(deleted_ids) < chunk_size:
+            return
+
+
+def schedule_school_purge(purge: SchoolPurgeStatus) -> None:
+    """
+    Start a purge as a task of its own, detached from the request.
+
+    Unlike a response background task, it does not hold the request open, so
+    the purge is not part of the request's measured latency. It also runs in
+    an empty context, which keeps its queries out of the request's
+    Server-Timing and query count.
+
+    Args:
+        purge (SchoolPurgeStatus): The pending purge job.
+    """
+    task = contextvars.Context().run(asyncio.create_task, purge_school(purge))
+    _purge_tasks.add(task)
+    task.add_done_callback(_purge_tasks.discard)
+
+
+async def purge_school(purge: SchoolPurgeStatus, session_factory=AsyncSessionLocal) -> None:
+    """
+    Delete a school in chunks, reporting progress as it goes.
+
+    Invoices and students are deleted ``SCHOOL_PURGE_CHUNK_SIZE`` rows per
+    transaction so no single statement holds locks on the whole school, and
+    the school row itself is deleted last. The cached entries of each chunk
+    are evicted once it is committed.
+
+    Args:
+        purge (SchoolPurgeStatus): The pending purge job.
+        session_factory: Factory for the session the purge runs in.
+    """
+    purge.status = "running"
+    try:
+        async with session_factory() as session:
+            purge.invoices_total = (
+                await session.execute(select(func.count()).where(Invoice.school_id == purge.school_id))
+            ).scalar_one()
+            purge.students_total = (
+                await session.execute(select(func.count()).where(Student.school_id == purge.school_id))
+            ).scalar_one()
+            await _save_purge_status(purge)
+
+            async def invoices_deleted(ids):
+                purge.invoices_deleted += len(ids)
+                await _delete_cached_entries("invoice", ids)
+                await _save_purge_status(purge)
+
+            async def students_deleted(ids):
+                purge.students_deleted += len(ids)
+                await _delete_cached_entries("student", ids)
+                await _save_purge_status(purge)
+
+            await _delete_in_chunks(session, Invoice.__table__, purge.school_id, invoices_deleted)
+            await _delete_in_chunks(session, Student.__table__, purge.school_id, students_deleted)
+            await session.execute(delete(School.__table__).where(School.__table__.c.id == purge.school_id))
+            await session.commit()
+    except Exception:
+        logger.exception("Purge %s of school %s failed", purge.job_id, purge.school_id)
+        purge.status = "failed"
+    else:
+        purge.status = "completed"
+
+    # Even a failed purge may have deleted part of the school's rows.
+    await cache_delete(f"school:{purge.school_id}")
+    await _invalidate_school_namespaces()
+    await _save_purge_status(purge)
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from .schema import StudentCreate, StudentOut
 from . import service as student_service
 from app.deps.db import get_db
 from app.deps.user import get_current_user
-from app.user.model import User
+from app.core.pagination import decode_cursor
+from app.core.export import ExportFormat
+from app.core.bulk import BulkCreateResult
+from app.core.cache import detail_etag
+from app.core.etag import etag_matches, not_modified
+from app.core.config import settings
+from app.user.schema import UserOut
 
 
 router = APIRouter(prefix="/students", tags=["students"])
@@ -17,33 +23,79 @@ router = APIRouter(prefix="/students", tags=["students"])
 async def create_student(
     student: StudentCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
     """Create a new student."""
     return await student_service.create_student(db, student)
 
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_students_bulk(
+    rows: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Create a batch of students, reporting the rows that could not be created."""
+    if len(rows) > settings.BULK_CREATE_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.BULK_CREATE_MAX_ROWS} rows",
+        )
+    return await student_service.create_students_bulk(db, rows)
+
+
 @router.get("/", response_model=List[StudentOut])
 async def read_students(
     skip: int = 0,
     limit: int = 10,
+    after: Optional[UUID] = Depends(decode_cursor),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Retrieve a list of students, paginated by offset or by the ``cursor`` of the previous page."""
+    return await student_service.get_students_response(
+        db, skip, limit, after, if_none_match
+    )
+
+
+@router.get("/batch", response_model=List[StudentOut])
+async def read_students_batch(
+    ids: List[UUID] = Query(..., max_length=settings.BATCH_MAX_IDS),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user),
+):
+    """Retrieve several students at once, in the order of the repeated ``ids`` parameter."""
+    return await student_service.get_students_batch(db, ids)
+
+
+@router.get("/export")
+async def export_students(
+    format: ExportFormat = "ndjson",
+    current_user: UserOut = Depends(get_current_user),
 ):
-    """Retrieve a list of students."""
-    return await student_service.get_students(db, skip, limit)
+    """Stream every student as NDJSON or CSV."""
+    return student_service.export_students(format)
 
 
 @router.get("/{student_id}", response_model=StudentOut)
 async def read_student(
     student_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
-    """Retrieve a single student by ID."""
+    """Retrieve a single student by ID, or a 304 if the client's ETag is current."""
+    etag = await detail_etag("students", student_id)
+    if etag_matches(if_none_match, etag, wildcard=False):
+        return not_modified(etag)
     student = await student_service.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return student
 
 
@@ -51,7 +103,7 @@ async def read_student(
 async def delete_student(
     student_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserOut = Depends(get_current_user),
 ):
     """Delete a student by ID."""
     student = await student_service.delete_student(db, student_id)
@@ -17,7 +17,11 @@ class Student(Base):
     document_type_id = Column(
         UUID(as_uuid=True), ForeignKey("document_types.id"), nullable=False
     )
-    school_id = Column(UUID(as_uuid=True), ForeignKey("schools.id", ondelete="CASCADE"))
+    school_id = Column(
+        UUID(as_uuid=True), ForeignKey("schools.id", ondelete="CASCADE"), index=True
+    )
 
     school = relationship("School", back_populates="students")
-    document_type = relationship("DocumentType", back_populates="students")
+    # Never loaded: responses take the document type from the in-memory
+    # registry through student.service.to_student_out.
+    document_type = relationship("DocumentType", back_populates="students", lazy="raise")
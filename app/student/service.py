@@ -1,88 +1,235 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID, uuid4
+from typing import List, Optional
 from .model import Student
-from .schema import StudentCreate, StudentOut
-import json
-from app.deps.redis import redis_client
+from .schema import StudentBase, StudentCreate, StudentOut
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from app.core.pagination import next_cursor_headers
+from app.core.export import ExportFormat, export_response
+from app.core.serialization import dump_list
+from app.db.database import ReplicaSessionLocal
+from app.core.bulk import (
+    BulkCreateResult,
+    BulkRowError,
+    chunked,
+    existing_values,
+    validate_rows,
+)
+from app.document_type.model import DocumentType
+from app.document_type.service import get_document_type, get_document_types
+from app.school.model import School
+from app.core.cache import (
+    cache_aside,
+    cache_aside_many,
+    cache_delete,
+    cache_set,
+    cached_response,
+    entity_cache_key,
+    entity_key,
+    invalidate_namespace,
+    list_cache_key,
+)
 
 
-async def create_student(db: AsyncSession, student: StudentCreate) -> Student:
+async def create_student(db: AsyncSession, student: StudentCreate) -> StudentOut:
     """
     Creates a new student in the database.
+
+    The row is written with a single INSERT ... RETURNING and the document
+    type comes from the in-memory lookup, so nothing is read back afterwards.
     """
-    db_student = Student(**student.model_dump())
-    db.add(db_student)
+    result = await db.execute(
+        insert(Student).values(id=uuid4(), **student.model_dump()).returning(Student)
+    )
+    db_student = result.scalar_one()
     await db.commit()
-    await db.refresh(db_student)
+    await invalidate_namespace("students")
+    return await to_student_out(db, db_student)
 
-    # Eagerly load the document_type relationship to prevent validation errors
-    result = await db.execute(
-        select(Student)
-        .options(selectinload(Student.document_type))
-        .where(Student.id == db_student.id)
+
+async def to_student_out(db: AsyncSession, db_student: Student) -> StudentOut:
+    """
+    Builds the response for a student, taking its document type from the
+    in-memory registry instead of loading the relationship.
+    """
+    return StudentOut(
+        **{field: getattr(db_student, field) for field in StudentBase.model_fields},
+        id=db_student.id,
+        document_type=await get_document_type(db, db_student.document_type_id),
     )
-    loaded_student = result.scalar_one_or_none()
 
-    # Invalidate cache for all students and specific student
-    if loaded_student:
-        await redis_client.delete(f"student:{loaded_student.id}")
-        await redis_client.delete(*await redis_client.keys("students:*"))
-            
-    return loaded_student
+
+def decode_student(cached: str) -> StudentOut:
+    """
+    Decodes a cached student, refreshing its document type from the registry
+    in case the type was renamed after the entry was cached.
+    """
+    student = StudentOut.model_validate_json(cached)
+    document_type = get_document_types().get(student.document_type_id)
+    if document_type is not None:
+        student.document_type = document_type
+    return student
 
 
-async def get_students(db: AsyncSession, skip: int = 0, limit: int = 10):
+async def create_students_bulk(db: AsyncSession, rows: list[dict]) -> BulkCreateResult:
     """
-    Retrieves a list of students from the database, with caching.
+    Validates and inserts a batch of students using multi-row INSERTs.
+
+    Rows that fail validation, reference a missing school or document type, or
+    reuse an email or document number are reported by their index instead of
+    failing the whole batch. The list cache is invalidated once per batch.
     """
-    cache_key = f"students:skip={skip}:limit={limit}"
-    cached_students = await redis_client.get(cache_key)
-    if cached_students:
-        return [StudentOut.model_validate_json(student) for student in json.loads(cached_students)]
+    students, errors = validate_rows(rows, StudentCreate)
 
-    result = await db.execute(
-        select(Student)
-        .options(selectinload(Student.document_type))
-        .offset(skip)
-        .limit(limit)
+    existing_schools = await existing_values(
+        db, School.id, {student.school_id for _, student in students}
+    )
+    existing_document_types = await existing_values(
+        db, DocumentType.id, {student.document_type_id for _, student in students}
+    )
+    taken_emails = await existing_values(
+        db, Student.email, {student.email for _, student in students}
     )
-    db_students = result.scalars().all()
-    if db_students:
-        await redis_client.setex(cache_key, 3600, json.dumps([StudentOut.model_validate(student).model_dump_json() for student in db_students]))
-    return db_students
+    taken_document_numbers = await existing_values(
+        db, Student.document_number, {student.document_number for _, student in students}
+    )
+
+    pending = []
+    for index, student in students:
+        if student.school_id not in existing_schools:
+            errors.append(BulkRowError(index=index, detail="School not found"))
+        elif student.document_type_id not in existing_document_types:
+            errors.append(BulkRowError(index=index, detail="Document type not found"))
+        elif student.email in taken_emails:
+            errors.append(BulkRowError(index=index, detail="Student with this email already exists"))
+        elif student.document_number in taken_document_numbers:
+            errors.append(BulkRowError(index=index, detail="Student with this document number already exists"))
+        else:
+            taken_emails.add(student.email)
+            taken_document_numbers.add(student.document_number)
+            pending.append((index, {"id": uuid4(), **student.model_dump()}))
+
+    ids = []
+    if pending:
+        inserted = set()
+        for chunk in chunked(pending):
+            result = await db.execute(
+                insert(Student)
+                .values([values for _, values in chunk])
+                .on_conflict_do_nothing()
+                .returning(Student.id)
+            )
+            inserted.update(result.scalars().all())
+        await db.commit()
+        for index, values in pending:
+            if values["id"] in inserted:
+                ids.append(values["id"])
+            else:
+                # Lost a race with a concurrent insert of the same email or document.
+                errors.append(BulkRowError(index=index, detail="Student conflicts with an existing record"))
+        await invalidate_namespace("students")
+
+    errors.sort(key=lambda error: error.index)
+    return BulkCreateResult(created=len(ids), ids=ids, errors=errors)
+
+
+async def get_students(
+    db: AsyncSession, skip: int = 0, limit: int = 10, after: Optional[UUID] = None
+):
+    """
+    Retrieves a list of students ordered by ID, optionally after a given ID.
+    """
+    query = select(Student).order_by(Student.id)
+    if after is not None:
+        query = query.where(Student.id > after)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_students_response(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    after: Optional[UUID] = None,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Retrieves a list of students as a pre-serialized JSON response, with caching and an ETag.
+    """
+    cache_key = await list_cache_key("students", after=after, skip=skip, limit=limit)
+
+    async def render():
+        db_students = await get_students(db, skip, limit, after)
+        body = dump_list(StudentOut, [await to_student_out(db, student) for student in db_students])
+        return body, next_cursor_headers(db_students, limit)
+
+    return await cached_response(cache_key, render, if_none_match)
 
 
 async def get_student(db: AsyncSession, student_id: UUID):
     """
     Retrieves a single student by their ID, with caching.
     """
-    cache_key = f"student:{student_id}"
-    cached_student = await redis_client.get(cache_key)
-    if cached_student:
-        return StudentOut.model_validate_json(cached_student)
+    cache_key = await entity_cache_key("student", student_id)
 
-    result = await db.execute(
-        select(Student)
-        .options(selectinload(Student.document_type))
-        .where(Student.id == student_id)
+    async def load():
+        result = await db.execute(select(Student).where(Student.id == student_id))
+        db_student = result.scalar_one_or_none()
+        if db_student is None:
+            return None
+        student = await to_student_out(db, db_student)
+        await cache_set(cache_key, student.model_dump_json())
+        return student
+
+    return await cache_aside(cache_key, load, decode_student, "students")
+
+
+async def get_students_batch(db: AsyncSession, student_ids: List[UUID]) -> List[StudentOut]:
+    """
+    Retrieves several students by their IDs, with caching, in the order requested.
+    """
+
+    async def load(missing_ids):
+        result = await db.execute(select(Student).where(Student.id.in_(missing_ids)))
+        return {
+            student.id: await to_student_out(db, student)
+            for student in result.scalars().all()
+        }
+
+    return await cache_aside_many(
+        student_ids,
+        await entity_key("student"),
+        load,
+        decode_student,
+        StudentOut.model_dump_json,
+        "students",
     )
-    db_student = result.scalar_one_or_none()
-    if db_student:
-        await redis_client.setex(cache_key, 3600, StudentOut.model_validate(db_student).model_dump_json())
-    return db_student
 
 
-async def delete_student(db: AsyncSession, student_id: UUID):
+async def delete_student(db: AsyncSession, student_id: UUID) -> Optional[StudentOut]:
     """
     Deletes a student from the database by their ID.
+
+    The response is built before the delete, since the document type
+    relationship is never loaded on the row itself.
     """
-    student = await get_student(db, student_id)
-    if student:
-        await db.delete(student)
-        await db.commit()
-        # Invalidate cache for the deleted student and all students
-        await redis_client.delete(f"student:{student_id}")
-        await redis_client.delete(*await redis_client.keys("students:*"))
+    result = await db.execute(select(Student).where(Student.id == student_id))
+    db_student = result.scalar_one_or_none()
+    if db_student is None:
+        return None
+    student = await to_student_out(db, db_student)
+    await db.delete(db_student)
+    await db.commit()
+    # Invalidate cache for the deleted student and all students
+    await cache_delete(await entity_cache_key("student", student_id))
+    await invalidate_namespace("students")
     return student
+
+
+def export_students(export_format: ExportFormat) -> StreamingResponse:
+    """Streams every student as NDJSON or CSV, ordered by ID."""
+    query = select(Student.__table__).order_by(Student.id)
+    return export_response(ReplicaSessionLocal, query, export_format, "students")
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from .schema import UserCreate, UserLogin
+from .schema import TokenRefresh, UserCreate, UserLogin, UserOut
 from .model import User
-from app.core.security import get_password_hash, verify_password, create_access_token
+from . import service as user_service
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.deps.db import get_db
+from app.deps.user import get_admin_user, get_token_payload
 from sqlalchemy.future import select
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -19,7 +25,7 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await get_password_hash_async(user.password),
     )
     db.add(db_user)
     await db.commit()
@@ -32,8 +38,56 @@ async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticates a user and returns an access token."""
     result = await db.execute(select(User).filter(User.username == user.username))
     db_user = result.scalar_one_or_none()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    if not db_user or not await verify_password_async(
+        user.password, db_user.hashed_password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if await user_service.is_access_revoked(db_user.username):
+        raise HTTPException(status_code=403, detail="User is disabled")
 
-    access_token = create_access_token(data={"sub": db_user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    claims = {"sub": db_user.username, "uid": db_user.id, "email": db_user.email}
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": await user_service.issue_refresh_token(claims),
+        "token_type": "bearer",
+    }
+
+
+@router.post("/refresh")
+async def refresh(token: TokenRefresh):
+    """Exchanges a refresh token for a new access token and refresh token."""
+    try:
+        claims, refresh_token = await user_service.rotate_refresh_token(
+            token.refresh_token
+        )
+    except user_service.RefreshTokenError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/logout")
+async def logout(payload: dict = Depends(get_token_payload)):
+    """Revokes the access token used for this request."""
+    if "jti" not in payload:
+        # Tokens issued before revocation existed carry no ID to revoke.
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+    await user_service.revoke_token(payload["jti"], payload["exp"])
+    return {"msg": "Logged out"}
+
+
+@router.post("/users/{username}/disable")
+async def disable_user(username: str, admin: UserOut = Depends(get_admin_user)):
+    """Disables a user, revoking all of their tokens."""
+    await user_service.disable_user(username)
+    return {"msg": "User disabled"}
+
+
+@router.post("/users/{username}/enable")
+async def enable_user(username: str, admin: UserOut = Depends(get_admin_user)):
+    """Re-enables a previously disabled user."""
+    await user_service.enable_user(username)
+    return {"msg": "User enabled"}
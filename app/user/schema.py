@@ -13,9 +13,13 @@ class UserOut(BaseModel):
     email: EmailStr
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class UserLogin(BaseModel):
     username: str
     password: str
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
@@ -0,0 +1,167 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from datetime import datetime, timezone
+from typing import Optional
+import hashlib
+import json
+import logging
+import secrets
+from .model import User
+from .schema import UserOut
+from app.core.cache import cache_aside, cache_delete, cache_set
+from app.core.config import settings
+from app.deps.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Atomically rotates a refresh token. The family key always points at the
+# newest token of a login session; presenting any older token of the family
+# means it was stolen or replayed, so the whole family is revoked. Every
+# token of a family expires together with it: the new token inherits what is
+# left of the presented token's TTL, so refreshing never extends a login.
+_ROTATE_REFRESH_TOKEN_SCRIPT = """
+local record = redis.call("GET", KEYS[1])
+local ttl = redis.call("PTTL", KEYS[1])
+if not record or ttl <= 0 then
+    return {0}
+end
+if redis.call("GET", KEYS[2]) ~= ARGV[1] then
+    redis.call("DEL", KEYS[2])
+    return {-1}
+end
+redis.call("SET", KEYS[2], ARGV[2], "PX", ttl)
+redis.call("SET", KEYS[3], record, "PX", ttl)
+return {1, record}
+"""
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, reused or revoked."""
+
+
+def _revoked_token_key(jti: str) -> str:
+    return f"auth:revoked:{jti}"
+
+
+def _disabled_user_key(username: str) -> str:
+    return f"auth:disabled:{username}"
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[UserOut]:
+    """
+    Retrieves a user by username, with a short-lived cache.
+    """
+    cache_key = f"user:{username}"
+
+    async def load():
+        result = await db.execute(select(User).filter(User.username == username))
+        db_user = result.scalar_one_or_none()
+        if db_user is None:
+            return None
+        user = UserOut.model_validate(db_user)
+        await cache_set(cache_key, user.model_dump_json(), ttl=settings.USER_CACHE_TTL_SECONDS)
+        return user
+
+    return await cache_aside(cache_key, load, UserOut.model_validate_json)
+
+
+async def is_access_revoked(username: str, jti: Optional[str] = None) -> bool:
+    """
+    Checks in a single Redis round trip whether a token was revoked or its user disabled.
+    """
+    keys = [_disabled_user_key(username)]
+    if jti:
+        keys.append(_revoked_token_key(jti))
+    return await redis_client.exists(*keys) > 0
+
+
+async def revoke_token(jti: str, expires_at: int) -> None:
+    """
+    Revokes a single access token until it would have expired anyway.
+    """
+    ttl = int(expires_at - datetime.now(timezone.utc).timestamp())
+    if ttl > 0:
+        await redis_client.setex(_revoked_token_key(jti), ttl, "1")
+
+
+async def disable_user(username: str) -> None:
+    """
+    Rejects every token of a user, and new logins, until the user is enabled again.
+    """
+    await redis_client.set(_disabled_user_key(username), "1")
+    await cache_delete(f"user:{username}")
+
+
+async def enable_user(username: str) -> None:
+    """
+    Lifts a previous disable_user call.
+    """
+    await redis_client.delete(_disabled_user_key(username))
+
+
+def _refresh_token_key(token_hash: str) -> str:
+    return f"auth:refresh:{token_hash}"
+
+
+def _refresh_family_key(family: str) -> str:
+    return f"auth:refresh_family:{family}"
+
+
+def _new_refresh_token(family: str) -> tuple[str, str]:
+    token = f"{family}.{secrets.token_urlsafe(32)}"
+    return token, hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_refresh_token(claims: dict) -> str:
+    """
+    Starts a new refresh token family for a login and returns its first token.
+
+    Only a hash of the token is stored, next to the claims the access tokens
+    it refreshes will carry.
+    """
+    family = secrets.token_urlsafe(16)
+    token, token_hash = _new_refresh_token(family)
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.setex(_refresh_token_key(token_hash), ttl, json.dumps(claims))
+        pipe.setex(_refresh_family_key(family), ttl, token_hash)
+        await pipe.execute()
+    return token
+
+
+async def rotate_refresh_token(token: str) -> tuple[dict, str]:
+    """
+    Exchanges a refresh token for the next one of its family in one round trip.
+
+    The new token expires when the family does, REFRESH_TOKEN_EXPIRE_DAYS
+    after the login, however often it was refreshed in between.
+
+    Returns:
+        tuple: The claims stored for the login and the new refresh token.
+
+    Raises:
+        RefreshTokenError: If the token is unknown or expired, its user is
+            disabled, or it was already used, in which case its whole family
+            is revoked.
+    """
+    family = token.split(".", 1)[0]
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    new_token, new_hash = _new_refresh_token(family)
+    outcome = await redis_client.eval(
+        _ROTATE_REFRESH_TOKEN_SCRIPT,
+        3,
+        _refresh_token_key(token_hash),
+        _refresh_family_key(family),
+        _refresh_token_key(new_hash),
+        token_hash,
+        new_hash,
+    )
+    if outcome[0] == -1:
+        logger.warning("Refresh token reuse detected, revoked token family %s", family)
+    if outcome[0] != 1:
+        raise RefreshTokenError()
+
+    claims = json.loads(outcome[1])
+    if await is_access_revoked(claims["sub"]):
+        raise RefreshTokenError()
+    return claims, new_token
@@ -0,0 +1,66 @@
+"""Add invoice filter indexes
+
+Revision ID: 7c1f4a2d9b3e
+Revises: 39ec9b57daf2
+Create Date: 2026-10-17 09:12:41.318245
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f4a2d9b3e"
+down_revision: Union[str, Sequence[str], None] = "39ec9b57daf2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing invoice traffic is not blocked while
+    # the indexes are created on large tables.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_invoices_school_id_status_due_date",
+            "invoices",
+            ["school_id", "status", "due_date", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_invoices_due_date",
+            "invoices",
+            ["due_date", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_invoices_pending_due_date",
+            "invoices",
+            ["due_date", "id"],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_invoices_pending_due_date",
+            table_name="invoices",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_invoices_due_date", table_name="invoices", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_invoices_school_id_status_due_date",
+            table_name="invoices",
+            postgresql_concurrently=True,
+        )
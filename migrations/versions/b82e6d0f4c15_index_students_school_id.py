@@ -0,0 +1,41 @@
+"""Index students.school_id
+
+Revision ID: b82e6d0f4c15
+Revises: 7c1f4a2d9b3e
+Create Date: 2026-10-17 10:03:27.904512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b82e6d0f4c15"
+down_revision: Union[str, Sequence[str], None] = "7c1f4a2d9b3e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ON DELETE CASCADE from schools looks students up by school_id.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_students_school_id"),
+            "students",
+            ["school_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_students_school_id"),
+            table_name="students",
+            postgresql_concurrently=True,
+        )
@@ -14,8 +14,14 @@ from app.main import app
 from app.deps.db import get_db
 from app.deps.user import get_current_user
 from app.db.base import Base
+from app.core.cache import local_cache
+from app.document_type import service as document_type_service
 from tests.mocks import MockUser, MockDocumentType, MockSchool
 from app.student.schema import DocumentTypeOut
+from app.school.model import School
+from app.student.model import Student
+from app.invoice.model import Invoice
+from sqlalchemy import Insert
 
 @pytest.fixture(autouse=True)
 def mock_redis_client(mocker):
@@ -23,6 +29,22 @@ def mock_redis_client(mocker):
     mocker.patch('app.deps.redis.redis_client.setex', new_callable=AsyncMock, return_value=None)
     mocker.patch('app.deps.redis.redis_client.delete', new_callable=AsyncMock, return_value=None)
     mocker.patch('app.deps.redis.redis_client.keys', new_callable=AsyncMock, return_value=[])
+    mocker.patch('app.deps.redis.redis_client.incr', new_callable=AsyncMock, return_value=1)
+    mocker.patch('app.deps.redis.redis_client.publish', new_callable=AsyncMock, return_value=0)
+    mocker.patch('app.deps.redis.redis_client.set', new_callable=AsyncMock, return_value=True)
+    mocker.patch('app.deps.redis.redis_client.eval', new_callable=AsyncMock, return_value=1)
+    mocker.patch('app.deps.redis.redis_client.exists', new_callable=AsyncMock, return_value=0)
+    mocker.patch('app.deps.redis.redis_client.mget', new_callable=AsyncMock, side_effect=lambda keys: [None] * len(keys))
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[])
+    mocker.patch('app.deps.redis.redis_client.pipeline').return_value.__aenter__.return_value = pipeline
+    local_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_document_types(mocker):
+    """Starts every test with an empty document type registry."""
+    mocker.patch.object(document_type_service, "_registry", {})
 
 @pytest.fixture
 def mock_document_type():
@@ -111,6 +133,21 @@ def mock_db_session():
 
     # Mock for db.execute
     def execute_side_effect(statement):
+        # INSERT ... RETURNING: store the row and return it as the created object
+        if isinstance(statement, Insert):
+            models = {"schools": School, "students": Student, "invoices": Invoice}
+            obj = models[statement.table.name](**statement.compile().params)
+            store(obj)
+            mock_result = MagicMock()
+            mock_result.scalar_one.return_value = obj
+            return mock_result
+        # Check if the statement is for the DocumentType model
+        if "FROM document_types" in str(statement.compile()):
+            mock_result = MagicMock()
+            mock_result.scalars.return_value.all.return_value = list(
+                mock_document_types_db.values()
+            )
+            return mock_result
         # Check if the statement is for the User model
         if "users" in str(statement.compile()):
             mock_result = MagicMock()
@@ -221,7 +258,7 @@ def mock_db_session():
     session.execute.side_effect = execute_side_effect
 
     # Mock for db.add
-    async def mock_add(obj):
+    def store(obj):
         if hasattr(obj, "username"):  # It's a User object
             mock_users_db[obj.username] = MockUser(
                 obj.username, obj.email, test_hashed_password
@@ -242,6 +279,9 @@ def mock_db_session():
         elif hasattr(obj, "name"):  # It's a School object
             mock_schools_db[obj.id] = obj
 
+    async def mock_add(obj):
+        store(obj)
+
     session.add.side_effect = mock_add
 
     # Mock for db.refresh
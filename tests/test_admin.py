@@ -0,0 +1,84 @@
+"""Tests for the admin diagnostics endpoints."""
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.util import greenlet_spawn
+from unittest.mock import MagicMock
+
+from app.db.pool import TimedQueuePool
+from app.deps.redis import redis_client
+from app.deps.user import get_admin_user
+from app.main import app
+from tests.mocks import MockUser
+
+
+@pytest.fixture
+def admin_client(client: TestClient):
+    """Provides a TestClient whose requests pass the admin dependency."""
+    app.dependency_overrides[get_admin_user] = lambda: MockUser(
+        username="admin", email="admin@example.com", hashed_password="x"
+    )
+    yield client
+    app.dependency_overrides.pop(get_admin_user, None)
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkouts_and_timeouts():
+    """Test that the pool counts checkouts, waits and checkout timeouts."""
+    pool = TimedQueuePool(creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+
+    def exhaust_pool():
+        connection = pool.connect()
+        with pytest.raises(TimeoutError):
+            pool.connect()
+        connection.close()
+
+    await greenlet_spawn(exhaust_pool)
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_max"] >= 0.01
+
+
+def test_db_pool_stats(admin_client: TestClient):
+    """Test that the pool statistics are reported to admins."""
+    response = admin_client.get("/admin/db-pool")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {"size", "checked_out", "overflow", "timeouts", "wait_seconds_max"} <= set(
+        response.json()
+    )
+
+
+def test_db_pool_stats_requires_admin(client: TestClient):
+    """Test that the pool statistics are not exposed without a token."""
+    response = client.get("/admin/db-pool")
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_slow_queries(admin_client: TestClient, mocker):
+    """Test that the captured slow queries are listed to admins."""
+    entry = {"statement": "SELECT 1", "duration_ms": 900.0}
+    mocker.patch("app.admin.controller.get_slow_queries", return_value=[entry])
+
+    response = admin_client.get("/admin/slow-queries")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [entry]
+
+
+def test_read_profile(admin_client: TestClient):
+    """Test that a finished profile is served as collapsed stacks."""
+    redis_client.get.return_value = "app.main:root 3\n"
+
+    response = admin_client.get("/admin/profiles/abc")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "app.main:root 3\n"
+    assert response.headers["content-type"].startswith("text/plain")
+    redis_client.get.assert_awaited_once_with("profile:abc")
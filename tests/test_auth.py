@@ -0,0 +1,188 @@
+"""Tests for token authentication and revocation."""
+
+import hashlib
+import json
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException, status
+from fastapi.testclient import TestClient
+from jose import jwt
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.config import settings
+from app.core.security import ALGORITHM, SECRET_KEY, create_access_token
+from app.deps.redis import redis_client
+from app.deps.user import get_admin_user, get_current_user, get_token_payload
+from app.user.model import User
+from app.user import service as user_service
+from app.user.schema import UserOut
+
+
+@pytest.fixture
+def mock_db_session():
+    """Fixture that provides a mocked AsyncSession for database interactions."""
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_current_user_from_token_claims(mock_db_session):
+    """Test that the user is built from the token without querying the database."""
+    token = create_access_token({"sub": "alice", "uid": 7, "email": "alice@example.com"})
+
+    payload = await get_token_payload(token)
+    user = await get_current_user(payload, mock_db_session)
+
+    assert user == UserOut(id=7, username="alice", email="alice@example.com")
+    mock_db_session.execute.assert_not_called()
+    redis_client.exists.assert_awaited_once_with(
+        "auth:disabled:alice", f"auth:revoked:{payload['jti']}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_current_user_legacy_token_is_cached(mock_db_session):
+    """Test that tokens without user claims fall back to a cached lookup."""
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = User(
+        id=3, username="bob", email="bob@example.com", hashed_password="x"
+    )
+    payload = {"sub": "bob"}
+
+    first = await get_current_user(payload, mock_db_session)
+    second = await get_current_user(payload, mock_db_session)
+
+    assert first == second == UserOut(id=3, username="bob", email="bob@example.com")
+    mock_db_session.execute.assert_called_once()
+    redis_client.setex.assert_awaited_once_with(
+        "user:bob", settings.USER_CACHE_TTL_SECONDS, first.model_dump_json()
+    )
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected():
+    """Test that a revoked token or disabled user is rejected."""
+    redis_client.exists.return_value = 1
+    token = create_access_token({"sub": "alice", "uid": 7, "email": "alice@example.com"})
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_token_payload(token)
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_revokes_token(client: TestClient):
+    """Test that logging out revokes the token until it expires."""
+    token = create_access_token(
+        {"sub": "alice", "uid": 7, "email": "alice@example.com"},
+        expires_delta=timedelta(minutes=10),
+    )
+    jti = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["jti"]
+
+    response = client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    key, ttl, _ = redis_client.setex.call_args.args
+    assert key == f"auth:revoked:{jti}"
+    assert 590 <= ttl <= 600
+
+
+def test_logout_with_legacy_token(client: TestClient):
+    """Test that a token issued without a jti is refused instead of failing."""
+    token = jwt.encode({"sub": "bob", "exp": 4102444800}, SECRET_KEY, algorithm=ALGORITHM)
+
+    response = client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    redis_client.setex.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_admin_user_required(mocker):
+    """Test that only configured admins pass the admin dependency."""
+    mocker.patch.object(settings, "ADMIN_USERNAMES", ["root"])
+    admin = UserOut(id=1, username="root", email="root@example.com")
+    user = UserOut(id=2, username="alice", email="alice@example.com")
+
+    assert await get_admin_user(admin) == admin
+    with pytest.raises(HTTPException) as exc_info:
+        await get_admin_user(user)
+    assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_issue_refresh_token_stores_hash(mocker):
+    """Test that a refresh token is stored hashed, next to its claims."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipeline = mocker.patch.object(redis_client, "pipeline")
+    pipeline.return_value.__aenter__.return_value = pipe
+    claims = {"sub": "alice", "uid": 7, "email": "alice@example.com"}
+
+    token = await user_service.issue_refresh_token(claims)
+
+    family = token.split(".", 1)[0]
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    pipe.setex.assert_any_call(f"auth:refresh:{token_hash}", ttl, json.dumps(claims))
+    pipe.setex.assert_any_call(f"auth:refresh_family:{family}", ttl, token_hash)
+    pipe.execute.assert_awaited_once()
+
+
+def test_refresh_rotates_token(client: TestClient):
+    """Test that a refresh token is exchanged for new tokens."""
+    claims = {"sub": "alice", "uid": 7, "email": "alice@example.com"}
+    redis_client.eval.return_value = [1, json.dumps(claims)]
+
+    response = client.post("/auth/refresh", json={"refresh_token": "family.secret"})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["refresh_token"].startswith("family.")
+    assert data["refresh_token"] != "family.secret"
+    payload = jwt.decode(data["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    assert (payload["sub"], payload["uid"]) == ("alice", 7)
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_keeps_family_expiry():
+    """Test that a rotated token inherits the remaining TTL instead of a fresh one."""
+    claims = {"sub": "alice", "uid": 7, "email": "alice@example.com"}
+    redis_client.eval.return_value = [1, json.dumps(claims)]
+
+    _, new_token = await user_service.rotate_refresh_token("family.secret")
+
+    token_hash = hashlib.sha256(b"family.secret").hexdigest()
+    new_hash = hashlib.sha256(new_token.encode()).hexdigest()
+    redis_client.eval.assert_awaited_once_with(
+        user_service._ROTATE_REFRESH_TOKEN_SCRIPT,
+        3,
+        f"auth:refresh:{token_hash}",
+        "auth:refresh_family:family",
+        f"auth:refresh:{new_hash}",
+        token_hash,
+        new_hash,
+    )
+    assert '"PTTL", KEYS[1]' in user_service._ROTATE_REFRESH_TOKEN_SCRIPT
+
+
+@pytest.mark.parametrize("outcome", [[0], [-1]])
+def test_refresh_rejects_unknown_or_reused_token(client: TestClient, outcome):
+    """Test that unknown tokens and replayed tokens are rejected."""
+    redis_client.eval.return_value = outcome
+
+    response = client.post("/auth/refresh", json={"refresh_token": "family.secret"})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_refresh_rejects_disabled_user(client: TestClient):
+    """Test that a disabled user cannot refresh their tokens."""
+    claims = {"sub": "alice", "uid": 7, "email": "alice@example.com"}
+    redis_client.eval.return_value = [1, json.dumps(claims)]
+    redis_client.exists.return_value = 1
+
+    response = client.post("/auth/refresh", json={"refresh_token": "family.secret"})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    redis_client.exists.assert_awaited_once_with("auth:disabled:alice")
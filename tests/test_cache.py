@@ -0,0 +1,190 @@
+"""Tests for the Redis cache helpers."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.cache import (
+    CACHE_TTL_SECONDS,
+    LocalCache,
+    _BUMP_VERSION_SCRIPT,
+    cache_aside,
+    cache_aside_many,
+    cache_delete,
+    cache_get,
+    detail_etag,
+    invalidate_namespace,
+    list_cache_key,
+    local_cache,
+)
+from app.core.etag import etag_matches, make_etag
+from app.deps.redis import redis_client
+
+
+@pytest.mark.asyncio
+async def test_list_cache_key_uses_namespace_version():
+    """Test that list cache keys carry the current namespace generation."""
+    redis_client.get.return_value = "3"
+
+    cache_key = await list_cache_key("students", skip=0, limit=10)
+
+    assert cache_key == "students:v3:skip=0:limit=10"
+    redis_client.get.assert_awaited_once_with("students:version")
+
+
+@pytest.mark.asyncio
+async def test_list_cache_key_creates_missing_counter_at_epoch(mocker):
+    """Test that a missing counter starts at the clock, not at zero."""
+    mocker.patch("app.core.cache.time.time_ns", return_value=1_700_000_000_000_000_000)
+
+    cache_key = await list_cache_key("schools", skip=20, limit=5)
+
+    assert cache_key == "schools:v1700000000000000:skip=20:limit=5"
+    redis_client.set.assert_awaited_once_with("schools:version", "1700000000000000", nx=True)
+    # The new counter is served locally afterwards.
+    assert await list_cache_key("schools", skip=20, limit=5) == cache_key
+    redis_client.get.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_recreated_counter_never_reissues_a_generation(mocker):
+    """Test that ETags issued before Redis lost its data do not match afterwards."""
+    time_ns = mocker.patch("app.core.cache.time.time_ns", return_value=1_000_000_000)
+    old_etag = await detail_etag("students", "1")
+
+    # Redis restarts empty a little later.
+    local_cache.clear()
+    time_ns.return_value = 2_000_000_000
+
+    assert await detail_etag("students", "1") != old_etag
+
+
+@pytest.mark.asyncio
+async def test_invalidate_namespace_increments_version(mocker):
+    """Test that invalidation is a single scripted INCR instead of a KEYS scan."""
+    mocker.patch("app.core.cache.time.time_ns", return_value=5_000_000)
+
+    await invalidate_namespace("invoices")
+
+    redis_client.eval.assert_awaited_once_with(
+        _BUMP_VERSION_SCRIPT, 1, "invoices:version", 5_000
+    )
+    redis_client.keys.assert_not_called()
+    redis_client.delete.assert_not_called()
+
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the local tier stays within its size limit in LRU order."""
+    cache = LocalCache(max_size=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 3, "misses": 1}
+
+
+def test_local_cache_expires_entries():
+    """Test that local entries are dropped once their TTL has passed."""
+    cache = LocalCache(max_size=10, ttl_seconds=0)
+    cache.set("a", "1")
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_get_serves_hot_keys_locally():
+    """Test that a Redis hit is kept in the local tier for subsequent reads."""
+    redis_client.get.return_value = '{"id": 1}'
+
+    assert await cache_get("school:1") == '{"id": 1}'
+    assert await cache_get("school:1") == '{"id": 1}'
+
+    redis_client.get.assert_awaited_once_with("school:1")
+
+
+@pytest.mark.asyncio
+async def test_cache_delete_notifies_other_workers():
+    """Test that deleting a key evicts it locally and publishes the invalidation."""
+    local_cache.set("school:1", "{}")
+
+    await cache_delete("school:1")
+
+    assert local_cache.get("school:1") is None
+    redis_client.delete.assert_awaited_once_with("school:1")
+    redis_client.publish.assert_awaited_once_with("cache:invalidate", "school:1")
+
+
+@pytest.mark.asyncio
+async def test_cache_aside_coalesces_concurrent_misses():
+    """Test that concurrent misses for one key share a single loader call."""
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "loaded"
+
+    results = await asyncio.gather(
+        *(cache_aside("school:1", loader, str) for _ in range(5))
+    )
+
+    assert results == ["loaded"] * 5
+    assert calls == 1
+    redis_client.set.assert_awaited_once()
+    redis_client.eval.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_aside_waits_for_other_worker():
+    """Test that a miss locked by another worker reads its result from the cache."""
+    redis_client.set.return_value = False
+    redis_client.get.side_effect = [None, "cached"]
+    loader = AsyncMock()
+
+    result = await cache_aside("school:1", loader, str.upper)
+
+    assert result == "CACHED"
+    loader.assert_not_awaited()
+
+
+def test_etag_matches():
+    """Test the If-None-Match comparison, including lists, weak tags and *."""
+    etag = make_etag("schools:v1:id=1")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("schools:v2:id=1")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches("*", etag, wildcard=False)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+@pytest.mark.asyncio
+async def test_cache_aside_many_loads_only_misses():
+    """Test that a batch costs one MGET, one load of the misses and one backfill."""
+    redis_client.mget.side_effect = lambda keys: ["cached-a" if key == "item:a" else None for key in keys]
+    loader = AsyncMock(return_value={"b": "loaded-b"})
+    pipeline = redis_client.pipeline.return_value.__aenter__.return_value
+
+    values = await cache_aside_many(
+        ["c", "a", "b", "a"],
+        lambda item_id: f"item:{item_id}",
+        loader,
+        lambda cached: cached,
+        lambda value: value,
+    )
+
+    assert values == ["cached-a", "loaded-b"]
+    redis_client.mget.assert_awaited_once_with(["item:c", "item:a", "item:b"])
+    loader.assert_awaited_once_with(["c", "b"])
+    pipeline.setex.assert_called_once_with("item:b", CACHE_TTL_SECONDS, "loaded-b")
+    pipeline.execute.assert_awaited_once()
+    assert local_cache.get("item:a") == "cached-a"
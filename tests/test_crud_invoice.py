@@ -5,9 +5,11 @@ from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
 from datetime import date
 
-from app.invoice.service import get_invoice, get_invoices, create_invoice, delete_invoice
+from app.invoice.service import get_invoice, get_invoices, get_invoices_response, create_invoice, create_invoices_bulk, delete_invoice
 from app.invoice.model import Invoice
-from app.invoice.schema import InvoiceCreate
+from app.invoice.schema import InvoiceCreate, InvoiceFilter
+from app.core.pagination import Cursor, decode_sort_cursor
+from app.deps.redis import redis_client
 
 
 @pytest.fixture
@@ -74,13 +76,19 @@ async def test_create_invoice(mock_db_session):
         amount=120.0, due_date=date.today(), status="pending", school_id=uuid4()
     )
 
+    mock_db_session.execute.return_value.scalar_one.return_value = Invoice(
+        id=uuid4(), **invoice_create.model_dump()
+    )
+
     created_invoice = await create_invoice(mock_db_session, invoice_create)
 
     assert created_invoice.amount == invoice_create.amount
     assert created_invoice.school_id == invoice_create.school_id
-    mock_db_session.add.assert_called_once()
+    statement = mock_db_session.execute.call_args.args[0]
+    assert str(statement.compile()).startswith("INSERT INTO invoices")
+    assert "RETURNING" in str(statement.compile())
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once_with(created_invoice)
+    mock_db_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -114,3 +122,95 @@ async def test_delete_invoice_not_found(mock_db_session):
     assert deleted_invoice is None
     mock_db_session.delete.assert_not_called()
     mock_db_session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_invoices_response_cache_hit(mock_db_session):
+    """Test that a cached page is returned as the raw body without querying."""
+    redis_client.get.side_effect = [None, '{}\n[]']
+
+    response = await get_invoices_response(mock_db_session, skip=0, limit=10)
+
+    assert response.body == b"[]"
+    mock_db_session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_invoices_bulk(mock_db_session):
+    """Test that a batch is inserted at once and invalid rows are reported."""
+    school_id = uuid4()
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [school_id]
+    rows = [
+        {"amount": 10.0, "school_id": str(school_id)},
+        {"amount": "not a number", "school_id": str(school_id)},
+        {"amount": 20.0, "school_id": str(uuid4())},
+        {"amount": 30.0, "school_id": str(school_id)},
+    ]
+
+    result = await create_invoices_bulk(mock_db_session, rows)
+
+    assert result.created == 2
+    assert [error.index for error in result.errors] == [1, 2]
+    assert result.errors[1].detail == "School not found"
+    # One lookup of the referenced schools and one multi-row INSERT.
+    assert mock_db_session.execute.call_count == 2
+    mock_db_session.commit.assert_called_once()
+    assert redis_client.eval.await_args.args[2] == "invoices:version"
+
+
+@pytest.mark.asyncio
+async def test_get_invoices_filtered(mock_db_session):
+    """Test that filters and sort order are applied to the invoice query."""
+    filters = InvoiceFilter(
+        status="pending",
+        school_id=uuid4(),
+        due_from=date(2025, 1, 1),
+        due_to=date(2025, 1, 31),
+        sort="-due_date",
+    )
+
+    await get_invoices(
+        mock_db_session, limit=10, after=Cursor(uuid4(), "2025-01-15"), filters=filters
+    )
+
+    sql = str(mock_db_session.execute.call_args.args[0].compile())
+    assert "invoices.status = " in sql
+    assert "invoices.school_id = " in sql
+    assert "invoices.due_date >= " in sql
+    assert "invoices.due_date <= " in sql
+    assert "(invoices.due_date, invoices.id) < (" in sql
+    assert "ORDER BY invoices.due_date DESC NULLS FIRST, invoices.id DESC" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_invoices_null_due_dates(mock_db_session):
+    """Test that invoices without a due date are paged through after the dated ones."""
+    filters = InvoiceFilter(sort="due_date")
+
+    await get_invoices(mock_db_session, after=Cursor(uuid4(), "2025-01-15"), filters=filters)
+    sql = str(mock_db_session.execute.call_args.args[0].compile())
+    # Past the last dated invoice, the undated ones still follow.
+    assert "(invoices.due_date, invoices.id) > (" in sql
+    assert "OR invoices.due_date IS NULL" in sql
+    assert "ORDER BY invoices.due_date ASC NULLS LAST, invoices.id" in sql
+
+    await get_invoices(mock_db_session, after=Cursor(uuid4(), ""), filters=filters)
+    sql = str(mock_db_session.execute.call_args.args[0].compile())
+    assert "invoices.due_date IS NULL AND invoices.id > " in sql
+
+
+@pytest.mark.asyncio
+async def test_get_invoices_response_due_date_cursor(mock_db_session):
+    """Test that the next cursor of a due-date page carries the last due date."""
+    invoices = [
+        Invoice(id=uuid4(), amount=1, due_date=date(2025, 1, 1), status="pending", school_id=uuid4()),
+        Invoice(id=uuid4(), amount=2, due_date=None, status="pending", school_id=uuid4()),
+    ]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = invoices
+
+    response = await get_invoices_response(
+        mock_db_session, limit=2, filters=InvoiceFilter(sort="due_date")
+    )
+
+    cursor = decode_sort_cursor(response.headers["X-Next-Cursor"])
+    assert cursor == Cursor(invoices[-1].id, "")
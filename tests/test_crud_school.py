@@ -1,14 +1,28 @@
 """Tests for the CRUD operations of the School model."""
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
 
-from app.school.service import get_school, get_schools, create_school, delete_school
+from app.school.service import (
+    get_schools_batch,
+    get_school,
+    get_schools,
+    get_schools_response,
+    create_school,
+    delete_school,
+    purge_school,
+)
+from app.school import service as school_service
 from app.school.model import School
 from app.student.model import Student
 from app.invoice.model import Invoice
-from app.school.schema import SchoolCreate
+from app.school.schema import SchoolCreate, SchoolPurgeStatus, SchoolRead
+from app.core.config import settings
+from app.deps.redis import redis_client
+from app.core import timing
+from app.core.pagination import decode_cursor
 
 
 @pytest.fixture
@@ -35,6 +49,25 @@ async def test_get_school(mock_db_session):
     mock_db_session.execute.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_schools_batch(mock_db_session):
+    """Test that cached schools are not queried and the misses share one query."""
+    cached, missing, unknown = (School(id=uuid4(), name=f"School {n}") for n in range(3))
+    cached_school = SchoolRead.model_validate(cached)
+    redis_client.mget.side_effect = lambda keys: [
+        cached_school.model_dump_json() if key == f"school:{cached.id}" else None
+        for key in keys
+    ]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [missing]
+
+    schools = await get_schools_batch(mock_db_session, [unknown.id, missing.id, cached.id])
+
+    assert schools == [SchoolRead.model_validate(missing), cached_school]
+    mock_db_session.execute.assert_called_once()
+    statement = str(mock_db_session.execute.call_args.args[0].compile())
+    assert "schools.id IN" in statement
+
+
 @pytest.mark.asyncio
 async def test_get_schools(mock_db_session):
     """Test retrieving a list of schools."""
@@ -57,17 +90,23 @@ async def test_create_school(mock_db_session):
     """Test creating a new school."""
     school_create = SchoolCreate(name="New School")
 
+    mock_db_session.execute.return_value.scalar_one.return_value = School(
+        id=uuid4(), name=school_create.name
+    )
+
     created_school = await create_school(mock_db_session, school_create)
 
     assert created_school.name == school_create.name
-    mock_db_session.add.assert_called_once()
+    statement = mock_db_session.execute.call_args.args[0]
+    assert str(statement.compile()).startswith("INSERT INTO schools")
+    assert "RETURNING" in str(statement.compile())
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once_with(created_school)
+    mock_db_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_delete_school(mock_db_session):
-    """Test deleting an existing school."""
+    """Test deleting an existing school and dropping its cascaded children from the cache."""
     school_id = uuid4()
     mock_school = School(id=school_id, name="School to Delete")
     mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
@@ -79,6 +118,11 @@ async def test_delete_school(mock_db_session):
     assert deleted_school == mock_school
     mock_db_session.delete.assert_called_once_with(mock_school)
     mock_db_session.commit.assert_called_once()
+    # The children are never read; their cached entries go with a generation bump.
+    mock_db_session.execute.assert_called_once()
+    redis_client.delete.assert_awaited_once_with(f"school:{school_id}")
+    bumped = {call.args[2] for call in redis_client.eval.await_args_list}
+    assert {"student:entities:version", "invoice:entities:version"} <= bumped
 
 
 @pytest.mark.asyncio
@@ -92,3 +136,120 @@ async def test_delete_school_not_found(mock_db_session):
     assert deleted_school is None
     mock_db_session.delete.assert_not_called()
     mock_db_session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_schools_response_cache_hit(mock_db_session):
+    """Test that a cached page is returned as the raw body without querying."""
+    cached_body = '[{"name":"Cached School","address":null,"id":"%s"}]' % uuid4()
+    redis_client.get.side_effect = [None, '{}\n' + cached_body]
+
+    response = await get_schools_response(mock_db_session, skip=0, limit=10)
+
+    assert response.body == cached_body.encode()
+    assert response.media_type == "application/json"
+    mock_db_session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_schools_response_cache_miss(mock_db_session):
+    """Test that an uncached page is rendered once and stored as the response body."""
+    redis_client.get.side_effect = lambda key: "0" if key == "schools:version" else None
+    school = School(id=uuid4(), name="School 1")
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [school]
+
+    response = await get_schools_response(mock_db_session, skip=0, limit=10)
+
+    expected_body = "[" + SchoolRead.model_validate(school).model_dump_json() + "]"
+    assert response.body == expected_body.encode()
+    redis_client.setex.assert_awaited_once_with(
+        "schools:v0:after=None:skip=0:limit=10", 3600, "{}\n" + expected_body
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_schools_after_cursor(mock_db_session):
+    """Test that cursor pagination seeks past the given ID in ID order."""
+    after = uuid4()
+
+    await get_schools(mock_db_session, limit=10, after=after)
+
+    statement = mock_db_session.execute.call_args.args[0]
+    sql = str(statement.compile())
+    assert "WHERE schools.id > " in sql
+    assert "ORDER BY schools.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_schools_response_next_cursor(mock_db_session):
+    """Test that a full page points to the next one through its last ID."""
+    schools = [School(id=uuid4(), name="School 1"), School(id=uuid4(), name="School 2")]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = schools
+
+    response = await get_schools_response(mock_db_session, skip=0, limit=2)
+
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == schools[-1].id
+
+
+def test_school_children_deleted_by_database():
+    """Test that deleting a school leaves its children to the ON DELETE CASCADE keys."""
+    assert School.students.property.passive_deletes is True
+    assert School.invoices.property.passive_deletes is True
+
+
+@pytest.mark.asyncio
+async def test_purge_school(mocker):
+    """Test that a purge deletes children in chunks and records its progress."""
+    mocker.patch.object(settings, "SCHOOL_PURGE_CHUNK_SIZE", 2)
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    counts = iter([3, 2])
+    deleted = iter([["i1", "i2"], ["i3"], ["s1", "s2"], [], ["school"]])
+
+    def execute_side_effect(statement):
+        result = MagicMock()
+        result.scalar_one.side_effect = lambda: next(counts)
+        if str(statement.compile()).startswith("DELETE"):
+            result.scalars.return_value.all.return_value = next(deleted)
+        return result
+
+    session.execute.side_effect = execute_side_effect
+    purge = SchoolPurgeStatus(job_id=uuid4(), school_id=uuid4(), status="pending")
+
+    await purge_school(purge, session_factory=lambda: session)
+
+    assert purge.status == "completed"
+    assert (purge.invoices_total, purge.invoices_deleted) == (3, 3)
+    assert (purge.students_total, purge.students_deleted) == (2, 2)
+    assert session.commit.await_count == 5
+    deleted_ids = {
+        key.rsplit(":", 1)[1]
+        for call in redis_client.delete.await_args_list
+        for key in call.args
+        if not key.startswith("school:")
+    }
+    assert deleted_ids == {"i1", "i2", "i3", "s1", "s2"}
+    saved = SchoolPurgeStatus.model_validate_json(redis_client.setex.call_args.args[2])
+    assert saved.status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_schedule_school_purge_runs_outside_request(mocker):
+    """Test that a purge does not count towards the request that started it."""
+    seen = []
+
+    async def fake_purge(purge):
+        seen.append((timing.current_route(), timing._spans.get()))
+
+    mocker.patch.object(school_service, "purge_school", fake_purge)
+    purge = SchoolPurgeStatus(job_id=uuid4(), school_id=uuid4(), status="pending")
+    scope_token = timing._scope.set({"method": "POST", "path": "/schools/x/purge"})
+    spans_token = timing._spans.set({})
+    try:
+        school_service.schedule_school_purge(purge)
+    finally:
+        timing._scope.reset(scope_token)
+        timing._spans.reset(spans_token)
+    await asyncio.gather(*school_service._purge_tasks)
+
+    assert seen == [(None, None)]
@@ -1,13 +1,18 @@
 """Tests for the CRUD operations of the Student model."""
 
+import json
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
 
-from app.student.service import get_student, get_students, create_student, delete_student
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.student.service import get_student, get_students, get_students_batch, get_students_response, create_student, create_students_bulk, delete_student
 from app.student.model import Student
 from app.document_type.model import DocumentType
-from app.student.schema import StudentCreate
+from app.student.schema import DocumentTypeOut, StudentCreate, StudentOut
+from app.document_type import service as document_type_service
+from app.deps.redis import redis_client
 
 
 @pytest.fixture
@@ -20,7 +25,7 @@ def mock_db_session():
 
 
 @pytest.mark.asyncio
-async def test_get_student(mock_db_session):
+async def test_get_student(mock_db_session, mocker):
     """Test retrieving a single student by their ID."""
     student_id = uuid4()
     mock_document_type = DocumentType(id=uuid4(), name="DNI")
@@ -36,10 +41,16 @@ async def test_get_student(mock_db_session):
         document_type=mock_document_type,
     )
     mock_db_session.execute.return_value.scalar_one_or_none.return_value = mock_student
+    mocker.patch.object(
+        document_type_service,
+        "_registry",
+        {mock_document_type.id: DocumentTypeOut(id=mock_document_type.id, name="DNI")},
+    )
 
     student = await get_student(mock_db_session, student_id)
 
-    assert student == mock_student
+    assert student == StudentOut.model_validate(mock_student)
+    # The document type comes from the registry, not from a second query.
     mock_db_session.execute.assert_called_once()
 
 
@@ -103,20 +114,29 @@ async def test_create_student(mock_db_session):
         phone=student_create.phone,
         document_type_id=student_create.document_type_id,
         school_id=student_create.school_id,
-        document_type=DocumentType(id=student_create.document_type_id, name="DNI"),
     )
-    mock_db_session.execute.return_value.scalar_one_or_none.return_value = mock_student_to_return
+    mock_db_session.execute.return_value.scalar_one.return_value = mock_student_to_return
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [
+        DocumentType(id=student_create.document_type_id, name="DNI")
+    ]
 
     created_student = await create_student(mock_db_session, student_create)
 
-    assert created_student == mock_student_to_return
-    mock_db_session.add.assert_called_once()
+    assert created_student.id == mock_student_to_return.id
+    assert created_student.email == student_create.email
+    assert created_student.document_type.name == "DNI"
+    # One INSERT ... RETURNING, then a one-off load of the document types.
+    assert mock_db_session.execute.call_count == 2
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once()
+    mock_db_session.refresh.assert_not_called()
+
+    await create_student(mock_db_session, student_create)
+
+    assert mock_db_session.execute.call_count == 3
 
 
 @pytest.mark.asyncio
-async def test_delete_student(mock_db_session):
+async def test_delete_student(mock_db_session, mocker):
     """Test deleting an existing student."""
     student_id = uuid4()
     mock_document_type = DocumentType(id=uuid4(), name="DNI")
@@ -132,14 +152,46 @@ async def test_delete_student(mock_db_session):
         document_type=mock_document_type,
     )
     mock_db_session.execute.return_value.scalar_one_or_none.return_value = mock_student
+    mocker.patch.object(
+        document_type_service,
+        "_registry",
+        {mock_document_type.id: DocumentTypeOut(id=mock_document_type.id, name="DNI")},
+    )
 
     deleted_student = await delete_student(mock_db_session, student_id)
 
-    assert deleted_student == mock_student
+    assert deleted_student == StudentOut.model_validate(mock_student)
     mock_db_session.delete.assert_called_once_with(mock_student)
     mock_db_session.commit.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_delete_student_without_loaded_document_type(mock_db_session, mocker):
+    """Test that deleting a student never touches its unloaded document type."""
+    document_type = DocumentTypeOut(id=uuid4(), name="DNI")
+    db_student = Student(
+        id=uuid4(),
+        name="Student to Delete",
+        email="delete@example.com",
+        document_number="555",
+        address="555 Delete St",
+        phone="555-5555",
+        document_type_id=document_type.id,
+        school_id=uuid4(),
+    )
+    # A detached row behaves like one loaded by a session: the relationship is
+    # unloaded and accessing it raises.
+    make_transient_to_detached(db_student)
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = db_student
+    mocker.patch.object(document_type_service, "_registry", {document_type.id: document_type})
+
+    deleted_student = await delete_student(mock_db_session, db_student.id)
+
+    assert deleted_student.id == db_student.id
+    assert deleted_student.document_type == document_type
+    mock_db_session.delete.assert_called_once_with(db_student)
+
+
 @pytest.mark.asyncio
 async def test_delete_student_not_found(mock_db_session):
     """Test deleting a student that does not exist."""
@@ -151,3 +203,105 @@ async def test_delete_student_not_found(mock_db_session):
     assert deleted_student is None
     mock_db_session.delete.assert_not_called()
     mock_db_session.commit.assert_not_called()
+
+
+def detached_student(document_type_id):
+    """Returns a Student whose unloaded relationships raise, like a session-loaded row."""
+    db_student = Student(
+        id=uuid4(),
+        name="Detached Student",
+        email="detached@example.com",
+        document_number="666",
+        address="666 Detached St",
+        phone="555-6666",
+        document_type_id=document_type_id,
+        school_id=uuid4(),
+    )
+    make_transient_to_detached(db_student)
+    return db_student
+
+
+@pytest.mark.asyncio
+async def test_student_responses_without_loaded_document_type(mock_db_session, mocker):
+    """Test that every path returning a student builds it from the registry."""
+    document_type = DocumentTypeOut(id=uuid4(), name="DNI")
+    mocker.patch.object(document_type_service, "_registry", {document_type.id: document_type})
+    db_student = detached_student(document_type.id)
+    result = mock_db_session.execute.return_value
+    result.scalar_one.return_value = db_student
+    result.scalar_one_or_none.return_value = db_student
+    result.scalars.return_value.all.return_value = [db_student]
+
+    created = await create_student(
+        mock_db_session,
+        StudentCreate(
+            name=db_student.name,
+            email=db_student.email,
+            document_number=db_student.document_number,
+            address=db_student.address,
+            phone=db_student.phone,
+            document_type_id=db_student.document_type_id,
+            school_id=db_student.school_id,
+        ),
+    )
+    fetched = await get_student(mock_db_session, db_student.id)
+    batch = await get_students_batch(mock_db_session, [db_student.id])
+    page = await get_students_response(mock_db_session, skip=0, limit=10)
+    deleted = await delete_student(mock_db_session, db_student.id)
+
+    for student in (created, fetched, *batch, deleted):
+        assert student.document_type == document_type
+    assert json.loads(page.body)[0]["document_type"]["name"] == "DNI"
+
+
+@pytest.mark.asyncio
+async def test_get_students_response_cache_hit(mock_db_session):
+    """Test that a cached page is returned as the raw body without querying."""
+    redis_client.get.side_effect = [None, '{}\n[]']
+
+    response = await get_students_response(mock_db_session, skip=0, limit=10)
+
+    assert response.body == b"[]"
+    mock_db_session.execute.assert_not_called()
+
+
+
+@pytest.mark.asyncio
+async def test_create_students_bulk(mock_db_session, mocker):
+    """Test that duplicated rows in a batch are reported instead of failing it."""
+    school_id, document_type_id, new_id = uuid4(), uuid4(), uuid4()
+    mocker.patch("app.student.service.uuid4", return_value=new_id)
+
+    def execute_side_effect(statement):
+        result = MagicMock()
+        sql = str(statement.compile())
+        if sql.startswith("INSERT"):
+            result.scalars.return_value.all.return_value = [new_id]
+        elif "FROM schools" in sql:
+            result.scalars.return_value.all.return_value = [school_id]
+        elif "FROM document_types" in sql:
+            result.scalars.return_value.all.return_value = [document_type_id]
+        else:
+            result.scalars.return_value.all.return_value = []
+        return result
+
+    mock_db_session.execute.side_effect = execute_side_effect
+    row = {
+        "name": "Bulk Student",
+        "email": "bulk@example.com",
+        "document_number": "555",
+        "address": "555 Bulk St",
+        "phone": "555-5555",
+        "document_type_id": str(document_type_id),
+        "school_id": str(school_id),
+    }
+
+    result = await create_students_bulk(mock_db_session, [row, row])
+
+    assert result.created == 1
+    assert result.ids == [new_id]
+    assert len(result.errors) == 1
+    assert result.errors[0].index == 1
+    assert result.errors[0].detail == "Student with this email already exists"
+    mock_db_session.commit.assert_called_once()
+    assert redis_client.eval.await_args.args[2] == "students:version"
@@ -0,0 +1,137 @@
+"""Tests for routing database sessions between the primary and the replica."""
+
+import pytest
+from fastapi import Response
+from sqlalchemy import delete, select
+from starlette.requests import Request
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core import cache
+from app.core.config import settings
+from app.db import database
+from app.deps.redis import redis_client
+from app.deps import db as db_deps
+from app.school.model import School
+
+
+def make_request(method: str, cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+@pytest.fixture
+def replica(mocker):
+    """Configures a fake replica engine."""
+    replica_engine = MagicMock()
+    mocker.patch.object(database, "replica_engine", replica_engine)
+    mocker.patch.object(db_deps, "replica_engine", replica_engine)
+    return replica_engine
+
+
+def test_reads_of_replica_sessions_go_to_replica(replica):
+    """Test that only SELECTs of replica-flagged sessions use the replica."""
+    read_session = database.RoutingSession(info={database.USE_REPLICA: True})
+    write_session = database.RoutingSession()
+
+    assert read_session.get_bind(clause=select(School)) is replica.sync_engine
+    assert read_session.get_bind(clause=delete(School)) is database.engine.sync_engine
+    assert write_session.get_bind(clause=select(School)) is database.engine.sync_engine
+
+
+def test_reading_from_primary_overrides_replica_sessions(replica):
+    """Test that reads inside reading_from_primary() skip the replica."""
+    session = database.RoutingSession(info={database.USE_REPLICA: True})
+
+    with database.reading_from_primary():
+        assert session.get_bind(clause=select(School)) is database.engine.sync_engine
+    assert session.get_bind(clause=select(School)) is replica.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_cache_fills_after_a_write_read_from_primary(replica, mocker):
+    """Test that a lagging replica cannot fill the shared cache right after a write."""
+    mocker.patch.object(settings, "REPLICA_DATABASE_URL", "postgresql+asyncpg://replica/db")
+    session = database.RoutingSession(info={database.USE_REPLICA: True})
+    binds = []
+
+    async def load():
+        binds.append(session.get_bind(clause=select(School)))
+        return "page"
+
+    await cache.cache_aside("schools:v1:a", load, str, "schools")
+    await cache.invalidate_namespace("schools")
+    redis_client.set.assert_any_call(
+        "schools:written", 1, ex=settings.REPLICA_STICKINESS_SECONDS
+    )
+    redis_client.exists.return_value = 1
+    await cache.cache_aside("schools:v2:a", load, str, "schools")
+
+    assert binds == [replica.sync_engine, database.engine.sync_engine]
+
+
+def test_without_replica_everything_goes_to_primary():
+    """Test that the primary is used when no replica is configured."""
+    session = database.RoutingSession(info={database.USE_REPLICA: True})
+
+    assert session.get_bind(clause=select(School)) is database.engine.sync_engine
+
+
+async def open_session(request: Request, response: Response):
+    dependency = db_deps.get_db(request, response)
+    session = await anext(dependency)
+    await dependency.aclose()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_get_requests_read_from_replica(replica):
+    """Test that safe requests get a replica session and set no cookie."""
+    response = Response()
+
+    session = await open_session(make_request("GET"), response)
+
+    assert session.info[database.USE_REPLICA] is True
+    assert "set-cookie" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_writes_pin_client_to_primary(replica):
+    """Test that a write uses the primary and makes the client's next reads sticky."""
+    response = Response()
+
+    session = await open_session(make_request("POST"), response)
+    sticky = await open_session(make_request("GET", "db_primary=1"), Response())
+
+    assert session.info[database.USE_REPLICA] is False
+    assert "db_primary=1" in response.headers["set-cookie"]
+    assert sticky.info[database.USE_REPLICA] is False
+
+
+@pytest.mark.asyncio
+async def test_session_is_created_on_first_use(mocker):
+    """Test that requests which never query do not create a session."""
+    session_factory = mocker.patch.object(
+        db_deps, "AsyncSessionLocal", return_value=AsyncMock()
+    )
+
+    unused = await open_session(make_request("GET"), Response())
+    used = db_deps.LazySession()
+    await used.execute(select(School))
+    await used.close()
+
+    assert not unused.started
+    session_factory.assert_called_once_with()
+    session_factory.return_value.execute.assert_awaited_once()
+    session_factory.return_value.close.assert_awaited_once()
+
+
+def test_statement_caches_can_be_disabled(mocker):
+    """Test that a zero cache size turns off both prepared statement caches."""
+    mocker.patch.object(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+
+    connect_args = database._connect_args()
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
@@ -0,0 +1,92 @@
+"""Tests for the in-memory document type registry."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.deps.redis import redis_client
+from app.document_type import service as document_type_service
+from app.document_type.model import DocumentType
+from app.student.schema import DocumentTypeOut, StudentOut
+from app.student.service import decode_student
+
+
+@pytest.fixture
+def mock_db_session():
+    """Fixture that provides a mocked AsyncSession for database interactions."""
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_registry_is_loaded_once(mock_db_session):
+    """Test that known document types are served without querying."""
+    dni = DocumentType(id=uuid4(), name="DNI")
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [dni]
+
+    await document_type_service.load_document_types(mock_db_session)
+    document_type = await document_type_service.get_document_type(mock_db_session, dni.id)
+
+    assert document_type == DocumentTypeOut(id=dni.id, name="DNI")
+    assert dict(document_type_service.get_document_types()) == {dni.id: document_type}
+    mock_db_session.execute.assert_called_once()
+    with pytest.raises(TypeError):
+        document_type_service.get_document_types()[uuid4()] = document_type
+
+
+@pytest.mark.asyncio
+async def test_unknown_document_type_reloads_registry(mock_db_session):
+    """Test that a document type added since the last load is picked up."""
+    passport = DocumentType(id=uuid4(), name="Passport")
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [passport]
+
+    document_type = await document_type_service.get_document_type(mock_db_session, passport.id)
+    missing = await document_type_service.get_document_type(mock_db_session, uuid4())
+
+    assert document_type.name == "Passport"
+    assert missing is None
+    assert mock_db_session.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_notify_document_types_changed():
+    """Test that a change is announced to every worker."""
+    await document_type_service.notify_document_types_changed()
+
+    redis_client.publish.assert_awaited_once_with(
+        document_type_service.DOCUMENT_TYPES_CHANNEL, ""
+    )
+
+
+@pytest.mark.asyncio
+async def test_renamed_document_type_refreshes_students(mocker):
+    """Test that a renamed document type invalidates student pages and cached entries."""
+    dni = DocumentType(id=uuid4(), name="DNI")
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.execute.return_value = MagicMock()
+    session.execute.return_value.scalars.return_value.all.return_value = [dni]
+    mocker.patch.object(document_type_service, "AsyncSessionLocal", return_value=session)
+    await document_type_service._reload_document_types()
+    cached = StudentOut(
+        id=uuid4(),
+        name="Student",
+        email="student@example.com",
+        document_number="1",
+        address="1 Test St",
+        phone="555-0001",
+        document_type_id=dni.id,
+        school_id=uuid4(),
+        document_type=DocumentTypeOut(id=dni.id, name="DNI"),
+    ).model_dump_json()
+    redis_client.eval.reset_mock()
+
+    await document_type_service._reload_document_types()
+    redis_client.eval.assert_not_awaited()
+
+    dni.name = "National ID"
+    await document_type_service._reload_document_types()
+
+    assert redis_client.eval.await_args.args[2] == "students:version"
+    assert decode_student(cached).document_type.name == "National ID"
@@ -0,0 +1,90 @@
+"""Tests for the streaming CSV/NDJSON export."""
+
+import json
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from app.core.export import stream_rows
+from app.invoice.model import Invoice
+from sqlalchemy.future import select
+
+
+class FakeStreamResult:
+    """A streamed result that yields its rows in fixed-size partitions."""
+
+    def __init__(self, fields, partitions):
+        self.fields = fields
+        self._partitions = partitions
+
+    def keys(self):
+        return self.fields
+
+    async def partitions(self):
+        for rows in self._partitions:
+            yield rows
+
+
+def make_session_factory(result):
+    session = MagicMock()
+    session.__aenter__.return_value = session
+
+    async def stream(query):
+        session.streamed_query = query
+        return result
+
+    session.stream = stream
+    return lambda: session, session
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_ndjson():
+    """Test that each fetched batch is written out as NDJSON lines."""
+    invoice_id, school_id = uuid4(), uuid4()
+    result = FakeStreamResult(
+        ["id", "amount", "due_date", "status", "school_id"],
+        [[(invoice_id, 10.0, date(2025, 1, 31), "paid", school_id)], []],
+    )
+    session_factory, session = make_session_factory(result)
+
+    chunks = [
+        chunk
+        async for chunk in stream_rows(session_factory, select(Invoice.__table__), "ndjson")
+    ]
+
+    assert json.loads(chunks[0]) == {
+        "id": str(invoice_id),
+        "amount": 10.0,
+        "due_date": "2025-01-31",
+        "status": "paid",
+        "school_id": str(school_id),
+    }
+    assert session.streamed_query.get_execution_options()["yield_per"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_csv():
+    """Test that the CSV export starts with a header row."""
+    result = FakeStreamResult(["id", "amount"], [[(1, 10.0), (2, 20.0)], [(3, 30.0)]])
+    session_factory, _ = make_session_factory(result)
+
+    chunks = [
+        chunk
+        async for chunk in stream_rows(session_factory, select(Invoice.__table__), "csv")
+    ]
+
+    assert chunks == ["id,amount\r\n1,10.0\r\n2,20.0\r\n", "3,30.0\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_csv_empty():
+    """Test that an empty CSV export still contains the header row."""
+    session_factory, _ = make_session_factory(FakeStreamResult(["id"], []))
+
+    chunks = [
+        chunk
+        async for chunk in stream_rows(session_factory, select(Invoice.__table__), "csv")
+    ]
+
+    assert chunks == ["id\r\n"]
@@ -0,0 +1,100 @@
+"""Tests for the Prometheus metrics."""
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from redis.asyncio import Redis
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from app.core import metrics
+from app.core.cache import cache_get, local_cache
+from app.core.security import get_password_hash_async
+from app.deps.redis import InstrumentedRedis
+
+
+@pytest.fixture
+def histogram():
+    """Provides a histogram that is removed from the registry afterwards."""
+    histogram = metrics.Histogram("test_seconds", "Test latencies.", ["route"], buckets=(0.1, 1))
+    yield histogram
+    metrics.registry.remove(histogram)
+
+
+def test_histogram_renders_cumulative_buckets(histogram):
+    """Test the text exposition of a histogram."""
+    histogram.observe("/a", value=0.05)
+    histogram.observe("/a", value=0.1)
+    histogram.observe("/a", value=3)
+
+    assert histogram.render().splitlines() == [
+        "# HELP test_seconds Test latencies.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 3.15',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_requests_are_labelled_with_route_template(client: TestClient):
+    """Test that request latencies are recorded per route template and status."""
+    client.get(f"/schools/{uuid4()}")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/schools/{school_id}",status="404"}'
+        in response.text
+    )
+    assert 'db_pool_connections{engine="primary",state="checked_out"} 0' in response.text
+
+
+@pytest.mark.asyncio
+async def test_cache_lookups_are_counted_by_namespace():
+    """Test that cache hits and misses are counted per key namespace and tier."""
+    before = metrics.CACHE_REQUESTS._values.get(("school", "redis", "miss"), 0)
+
+    await cache_get(f"school:{uuid4()}")
+
+    assert metrics.CACHE_REQUESTS._values[("school", "redis", "miss")] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_redis_commands_are_timed(mocker):
+    """Test that every Redis command goes through the latency histogram."""
+    mocker.patch.object(Redis, "execute_command", AsyncMock(return_value="PONG"))
+    observe = mocker.spy(metrics.REDIS_COMMAND_SECONDS, "observe")
+
+    assert await InstrumentedRedis().execute_command("PING") == "PONG"
+
+    assert observe.call_args.args == ("PING",)
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_is_exported():
+    """Test that the password hashing queue wait times are exported."""
+    await get_password_hash_async("secret")
+
+    text = metrics.render()
+
+    assert 'password_hash_calls_total{result="completed"}' in text
+    assert "password_hash_wait_seconds_count" in text
+    assert "password_hash_pending 0" in text
+
+
+def test_local_cache_stats_are_exported():
+    """Test that the in-process cache tier's hits and misses are exported."""
+    local_cache.set("school:1", "{}")
+    local_cache.get("school:1")
+    local_cache.get("school:2")
+
+    text = metrics.render()
+
+    assert "# TYPE cache_local_hits_total counter" in text
+    assert "cache_local_hits_total 1" in text
+    assert "cache_local_misses_total 1" in text
+    assert "cache_local_entries 1" in text
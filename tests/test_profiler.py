@@ -0,0 +1,65 @@
+"""Tests for the sampling profiler."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core import profiler
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.deps.redis import redis_client
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_collapsed_stacks():
+    """Test that samples of a thread are aggregated as collapsed stacks."""
+    sampler = profiler.SamplingProfiler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    busy_work(0.1)
+    collapsed = sampler.stop()
+
+    lines = collapsed.splitlines()
+    assert any(f"{__name__}:busy_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].count(":") == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_window():
+    """Test that a window profile is stored once the window closes, one at a time."""
+    profile_id = await profiler.profile_window(0.01)
+
+    with pytest.raises(profiler.ProfilerBusy):
+        await profiler.profile_window(0.01)
+    await asyncio.gather(*profiler._window_tasks)
+
+    key, ttl, _ = redis_client.setex.call_args.args
+    assert (key, ttl) == (f"profile:{profile_id}", profiler.PROFILE_TTL_SECONDS)
+    assert profiler._active is None
+
+
+def test_profile_header_requires_admin(client: TestClient, mocker):
+    """Test that only admins can profile a request with the X-Profile header."""
+    mocker.patch.object(settings, "ADMIN_USERNAMES", ["root"])
+    admin = create_access_token({"sub": "root", "uid": 1, "email": "root@example.com"})
+    user = create_access_token({"sub": "alice", "uid": 2, "email": "alice@example.com"})
+
+    response = client.get("/", headers={"X-Profile": "1", "Authorization": f"Bearer {user}"})
+    assert "X-Profile-Id" not in response.headers
+    redis_client.setex.assert_not_called()
+
+    response = client.get("/", headers={"X-Profile": "1", "Authorization": f"Bearer {admin}"})
+    assert response.status_code == status.HTTP_200_OK
+    profile_id = response.headers["X-Profile-Id"]
+    redis_client.setex.assert_awaited_once()
+    assert redis_client.setex.call_args.args[0] == f"profile:{profile_id}"
@@ -0,0 +1,39 @@
+"""Tests for the SQL query counter."""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.query_counter import assert_max_queries, count_queries
+
+
+@pytest.fixture
+def sqlite_engine():
+    """Provides an in-memory SQLite engine to run real statements on."""
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def test_count_queries(sqlite_engine):
+    """Test that statements are counted only while the counter is attached."""
+    with sqlite_engine.connect() as conn:
+        with count_queries(sqlite_engine) as counter:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+
+    assert counter.count == 2
+    assert counter.statements == ["SELECT 1", "SELECT 2"]
+    assert counter.seconds > 0
+
+
+def test_assert_max_queries(sqlite_engine):
+    """Test that exceeding the query budget fails with the statements run."""
+    with sqlite_engine.connect() as conn:
+        with assert_max_queries(2, sqlite_engine):
+            conn.execute(text("SELECT 1"))
+
+        with pytest.raises(AssertionError, match="at most 1 queries, 2 were run"):
+            with assert_max_queries(1, sqlite_engine):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
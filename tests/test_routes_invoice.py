@@ -7,6 +7,7 @@ from uuid import uuid4, UUID
 from datetime import date
 
 from app.main import app
+from app.core.pagination import encode_cursor
 from app.invoice.schema import InvoiceOut
 
 
@@ -25,6 +26,16 @@ def test_create_invoice(authenticated_client: TestClient, mock_db_session):
     assert invoice.school_id == UUID(invoice_data["school_id"])
 
 
+def test_create_invoices_bulk_reports_invalid_rows(authenticated_client: TestClient, mock_db_session):
+    """Test that invalid rows of a batch are reported by index."""
+    rows = [{"amount": "abc", "school_id": str(uuid4())}, {"school_id": "not-a-uuid"}]
+    response = authenticated_client.post("/invoices/bulk", json=rows)
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert result["created"] == 0
+    assert [error["index"] for error in result["errors"]] == [0, 1]
+
+
 def test_read_invoices(authenticated_client: TestClient, mock_db_session):
     """Test retrieving a list of invoices via the API."""
     response = authenticated_client.get("/invoices/")
@@ -32,6 +43,27 @@ def test_read_invoices(authenticated_client: TestClient, mock_db_session):
     assert isinstance(response.json(), list)
 
 
+def test_export_invoices_invalid_format(authenticated_client: TestClient):
+    """Test that the export route only accepts the supported formats."""
+    response = authenticated_client.get("/invoices/export", params={"format": "xml"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"][0]["loc"] == ["query", "format"]
+
+
+def test_read_invoices_invalid_status(authenticated_client: TestClient):
+    """Test that invoices can only be filtered by a known status."""
+    response = authenticated_client.get("/invoices/", params={"status": "unknown"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_read_invoices_due_date_cursor_needs_due_date(authenticated_client: TestClient):
+    """Test that a due-date sort rejects a cursor that only carries an ID."""
+    response = authenticated_client.get(
+        "/invoices/", params={"sort": "due_date", "cursor": encode_cursor(uuid4())}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_read_invoice(authenticated_client: TestClient, mock_db_session):
     """Test retrieving a single invoice by ID via the API."""
     invoice_id = uuid4()
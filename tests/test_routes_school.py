@@ -7,6 +7,9 @@ from uuid import uuid4
 
 from app.main import app
 from app.school.schema import SchoolRead
+from app.core.cache import local_cache
+from app.core.config import settings
+from app.deps.redis import redis_client
 
 
 def test_create_school(authenticated_client: TestClient, mock_db_session):
@@ -25,6 +28,12 @@ def test_read_schools(authenticated_client: TestClient, mock_db_session):
     assert isinstance(response.json(), list)
 
 
+def test_read_schools_invalid_cursor(authenticated_client: TestClient, mock_db_session):
+    """Test that a malformed pagination cursor is rejected."""
+    response = authenticated_client.get("/schools/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_read_school(authenticated_client: TestClient, mock_db_session):
     """Test retrieving a single school by ID via the API."""
     school_id = uuid4()
@@ -37,3 +46,72 @@ def test_delete_school(authenticated_client: TestClient, mock_db_session):
     school_id = uuid4()
     response = authenticated_client.delete(f"/schools/{school_id}")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_purge_school_not_found(authenticated_client: TestClient, mock_db_session):
+    """Test that purging an unknown school returns 404."""
+    mock_db_session.execute.side_effect = None
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = None
+    response = authenticated_client.post(f"/schools/{uuid4()}/purge")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_read_school_purge_not_found(authenticated_client: TestClient):
+    """Test that an unknown purge job returns 404."""
+    response = authenticated_client.get(f"/schools/purges/{uuid4()}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_read_school_not_modified(authenticated_client: TestClient, mock_db_session):
+    """Test that a school is answered with 304 while the client's ETag is current."""
+    school = authenticated_client.post("/schools/", json={"name": "ETag School"}).json()
+
+    response = authenticated_client.get(f"/schools/{school['id']}")
+    etag = response.headers["ETag"]
+    assert response.status_code == status.HTTP_200_OK
+
+    response = authenticated_client.get(
+        f"/schools/{school['id']}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_read_school_wildcard_etag(authenticated_client: TestClient, mock_db_session):
+    """Test that If-None-Match: * only yields 304 for a school that exists."""
+    school = authenticated_client.post("/schools/", json={"name": "Wildcard School"}).json()
+
+    response = authenticated_client.get(f"/schools/{uuid4()}", headers={"If-None-Match": "*"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = authenticated_client.get(f"/schools/{school['id']}", headers={"If-None-Match": "*"})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_read_schools_not_modified(authenticated_client: TestClient, mock_db_session):
+    """Test that an unchanged list is answered with 304 without reading the cache."""
+    etag = authenticated_client.get("/schools/").headers["ETag"]
+    redis_client.get.reset_mock()
+
+    response = authenticated_client.get("/schools/", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    # Only the namespace version is checked, never the cached page itself.
+    redis_client.get.assert_not_awaited()
+
+    local_cache.clear()
+    redis_client.get.side_effect = lambda key: "1" if key == "schools:version" else None
+    response = authenticated_client.get("/schools/", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_read_schools_batch_limits_ids(authenticated_client: TestClient):
+    """Test that a batch is limited to BATCH_MAX_IDS IDs."""
+    ids = [str(uuid4()) for _ in range(settings.BATCH_MAX_IDS + 1)]
+
+    response = authenticated_client.get("/schools/batch", params={"ids": ids})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
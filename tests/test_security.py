@@ -0,0 +1,45 @@
+"""Tests for the password hashing pool."""
+
+import asyncio
+import pytest
+
+from app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    get_password_hash_async,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_off_the_event_loop():
+    """Test that hashing and verification round-trip through the pool."""
+    hashed_password = await get_password_hash_async("secret")
+
+    assert await verify_password_async("secret", hashed_password)
+    assert not await verify_password_async("wrong", hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_is_full():
+    """Test that calls beyond the queue limit fail fast instead of waiting."""
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def blocking_call():
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        return "done"
+
+    running = asyncio.create_task(hasher.run(blocking_call))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.run(str, "rejected")
+
+    release.set()
+    assert await running == "done"
+    stats = hasher.stats()
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
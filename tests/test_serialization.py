@@ -0,0 +1,29 @@
+"""Tests for the single-pass list serialization."""
+
+import json
+from datetime import date
+from uuid import uuid4
+
+from app.core.serialization import dump_list, list_adapter
+from app.invoice.model import Invoice
+from app.invoice.schema import InvoiceOut
+
+
+def test_dump_list_matches_per_row_serialization():
+    """Test that a list is serialized exactly like its rows one by one."""
+    invoices = [
+        Invoice(id=uuid4(), amount=10.5, due_date=date(2025, 1, 31), status="pending", school_id=uuid4()),
+        Invoice(id=uuid4(), amount=20.0, due_date=date(2025, 2, 28), status="paid", school_id=uuid4()),
+    ]
+
+    body = dump_list(InvoiceOut, invoices)
+
+    assert json.loads(body) == [
+        json.loads(InvoiceOut.model_validate(invoice).model_dump_json()) for invoice in invoices
+    ]
+    assert dump_list(InvoiceOut, []) == "[]"
+
+
+def test_list_adapter_is_cached():
+    """Test that the adapter of a schema is only built once."""
+    assert list_adapter(InvoiceOut) is list_adapter(InvoiceOut)
@@ -0,0 +1,83 @@
+"""Tests for the slow-query log."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.core import slow_queries
+from app.core.config import settings
+from app.db.database import engine
+
+
+@pytest.fixture(autouse=True)
+def empty_log():
+    """Starts every test with an empty slow-query log."""
+    slow_queries.clear_slow_queries()
+    yield
+    slow_queries.clear_slow_queries()
+
+
+def run_statement(statement, duration_ms, **execution_options):
+    context = SimpleNamespace(execution_options=execution_options)
+    conn = SimpleNamespace(engine=engine.sync_engine)
+    slow_queries._before_cursor_execute(conn, None, statement, ("x",), context, False)
+    context._slow_query_started -= duration_ms / 1000
+    slow_queries._after_cursor_execute(conn, None, statement, ("x",), context, False)
+
+
+def test_only_slow_queries_are_captured(mocker):
+    """Test that statements above the threshold are kept with their parameters."""
+    mocker.patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 100)
+    mocker.patch.object(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+
+    run_statement("SELECT 1", 10)
+    run_statement("SELECT 2 WHERE a = $1", 250)
+    run_statement("EXPLAIN SELECT 3", 250, skip_slow_query_log=True)
+
+    [entry] = slow_queries.get_slow_queries()
+    assert entry["statement"] == "SELECT 2 WHERE a = $1"
+    assert entry["parameters"] == "('x',)"
+    assert entry["duration_ms"] >= 250
+    assert entry["route"] is None
+
+
+@pytest.mark.asyncio
+async def test_sampled_slow_queries_are_explained(mocker):
+    """Test that a sampled slow query is explained in the background."""
+    mocker.patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 100)
+    mocker.patch.object(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1)
+    explain = mocker.patch.object(slow_queries, "_explain", AsyncMock())
+
+    run_statement("SELECT 2 WHERE a = $1", 250)
+    run_statement("BEGIN", 250)
+    await asyncio.sleep(0)
+
+    [explained, _] = reversed(slow_queries.get_slow_queries())
+    explain.assert_awaited_once_with(explained, engine.sync_engine, "SELECT 2 WHERE a = $1", ("x",))
+
+
+
+def test_failed_slow_queries_are_captured(mocker):
+    """Test that a slow statement that raises, e.g. on a statement timeout, is kept."""
+    mocker.patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 100)
+    mocker.patch.object(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+    context = SimpleNamespace(execution_options={}, executemany=False)
+    conn = SimpleNamespace(engine=engine.sync_engine)
+    slow_queries._before_cursor_execute(conn, None, "SELECT pg_sleep(60)", (), context, False)
+    context._slow_query_started -= 0.5
+
+    slow_queries._handle_error(
+        SimpleNamespace(
+            execution_context=context,
+            engine=engine.sync_engine,
+            statement="SELECT pg_sleep(60)",
+            parameters=(),
+            original_exception=TimeoutError("canceling statement due to statement timeout"),
+        )
+    )
+
+    [entry] = slow_queries.get_slow_queries()
+    assert entry["statement"] == "SELECT pg_sleep(60)"
+    assert entry["duration_ms"] >= 500
+    assert "statement timeout" in entry["error"]
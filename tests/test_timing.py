@@ -0,0 +1,70 @@
+"""Tests for the Server-Timing breakdown."""
+
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core import timing
+from app.core.config import settings
+from app.core.timing import format_server_timing, record, span
+
+
+def test_format_server_timing():
+    """Test the Server-Timing header value, in milliseconds."""
+    header = format_server_timing({"db": [0.0123, 3], "redis": [0.001, 1]}, 0.02)
+
+    assert header == 'db;dur=12.30;desc="3x", redis;dur=1.00;desc="1x", total;dur=20.00'
+
+
+def test_spans_outside_a_request_are_ignored():
+    """Test that timing code outside a request does nothing."""
+    record("db", 1.0)
+    with span("serialize"):
+        pass
+
+    assert timing._spans.get() is None
+
+
+def test_request_reports_server_timing(authenticated_client: TestClient, mocker, caplog):
+    """Test that a request reports its spans in a header and in the log."""
+    mocker.patch.object(settings, "SERVER_TIMING_LOG", True)
+
+    with caplog.at_level(logging.INFO, logger="app.core.timing"):
+        response = authenticated_client.get("/schools/")
+
+    entries = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert "serialize" in entries
+    assert entries[-1] == "total"
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged["path"] == "/schools/"
+    assert logged["status"] == 200
+    assert "serialize" in logged["spans"]
+
+
+def test_queries_are_timed():
+    """Test that the cursor execute events add to the db span."""
+    spans = {}
+    token = timing._spans.set(spans)
+    context = type("Context", (), {})()
+    try:
+        for _ in range(2):
+            timing._before_cursor_execute(None, None, "SELECT 1", (), context, False)
+            timing._after_cursor_execute(None, None, "SELECT 1", (), context, False)
+    finally:
+        timing._spans.reset(token)
+
+    assert spans["db"][1] == 2
+
+
+def test_query_count_warning(mocker, caplog):
+    """Test that requests running too many queries are logged."""
+    mocker.patch.object(settings, "QUERY_COUNT_WARNING_THRESHOLD", 2)
+    scope = {"method": "GET", "path": "/students/"}
+
+    with caplog.at_level(logging.WARNING, logger="app.core.timing"):
+        timing._warn_on_query_count(scope, {"db": [0.01, 2]})
+        timing._warn_on_query_count(scope, {"db": [0.03, 3]})
+
+    assert len(caplog.records) == 1
+    assert "GET /students/ ran 3 queries" in caplog.records[0].getMessage()